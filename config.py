@@ -1,6 +1,7 @@
 import os
+from functools import lru_cache
 from typing import Optional
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 
 
@@ -19,31 +20,100 @@ class Settings(BaseSettings):
     # File upload settings
     upload_dir: str = Field(default="./uploads", description="Upload directory")
     max_file_size: int = Field(default=50 * 1024 * 1024, description="Maximum file size in bytes")
-    allowed_extensions: list = Field(default=[".pdf"], description="Allowed file extensions")
+    allowed_extensions: list[str] = Field(default=[".pdf"], description="Allowed file extensions")
     
+    # Service initialization
+    eager_init: bool = Field(
+        default=False,
+        description="Load the RAG service (models, vector store) at startup instead of on first use"
+    )
+
     # Embedding settings
     embedding_model: str = Field(default="all-MiniLM-L6-v2", description="Sentence transformer model")
+    embedding_device: Optional[str] = Field(
+        default=None,
+        description="Device for the embedding model (e.g. cuda, cpu); auto-detected when unset"
+    )
+    embedding_fp16: bool = Field(
+        default=False,
+        description="Run the embedding model in half precision (CUDA only)"
+    )
+    embedding_precision: Optional[str] = Field(
+        default=None,
+        description="Embedding model precision: fp32, fp16 (CUDA) or int8 (CPU dynamic quantization)"
+    )
+    embedding_backend: str = Field(
+        default="torch",
+        description="Embedding inference backend: torch, onnx or onnx-int8 "
+                    "(onnx variants require optimum[onnxruntime])"
+    )
+    embedding_pool_devices: list[str] = Field(
+        default=[],
+        description="Devices for a sentence-transformers multi-process encode pool "
+                    "(e.g. ['cuda:0', 'cuda:0'] or ['cpu'] * 4); empty disables the pool"
+    )
     chunk_size: int = Field(default=1000, description="Text chunk size")
     chunk_overlap: int = Field(default=200, description="Chunk overlap")
     
     # Vector store settings
     vector_store_path: str = Field(default="./chroma_db", description="Vector database path")
+    hnsw_space: str = Field(
+        default="ip",
+        description="HNSW distance metric (ip, cosine, l2); embeddings are "
+                    "unit-normalized at ingest, so inner product equals cosine "
+                    "without the per-comparison norm division"
+    )
+    hnsw_m: int = Field(default=24, description="HNSW graph connectivity (hnsw:M)")
+    hnsw_ef_construction: int = Field(default=128, description="HNSW build-time candidate list size")
+    hnsw_ef_search: int = Field(default=100, description="HNSW query-time candidate list size")
+    hnsw_batch_size: int = Field(default=100, description="HNSW in-memory batch size before indexing")
+    hnsw_sync_threshold: int = Field(default=10000, description="Vectors indexed before HNSW persists to disk")
+    embedding_storage_precision: str = Field(
+        default="float32",
+        description="Precision for embeddings handed to the vector store (float32 or float16)"
+    )
+    chroma_batch_size: int = Field(default=128, description="Batch size for ChromaDB document inserts")
+    chroma_unsafe_fast_ingest: bool = Field(
+        default=False,
+        description="Disable SQLite durability (synchronous=OFF, exclusive locking) during bulk ingestion"
+    )
+    ingest_workers: int = Field(
+        default=1,
+        description="Number of worker processes for parallel vector store ingestion (1 = in-process)"
+    )
+    ingest_queue_max: int = Field(
+        default=16,
+        description="Maximum number of uploads waiting for ingestion before new uploads are rejected"
+    )
     
     # RAG settings
     default_max_chunks: int = Field(default=5, description="Default maximum chunks to retrieve")
+    rerank_candidates: int = Field(
+        default=50,
+        description="ANN candidates fetched per query for exact cosine reranking"
+    )
     similarity_threshold: float = Field(default=0.3, description="Similarity threshold for relevance")
     
     # CORS settings
-    allowed_origins: list = Field(default=["*"], description="Allowed CORS origins")
+    allowed_origins: list[str] = Field(default=["*"], description="Allowed CORS origins")
     
     # Logging settings
     log_level: str = Field(default="INFO", description="Logging level")
     log_file: Optional[str] = Field(default=None, description="Log file path")
     
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        frozen=True,
+        extra="ignore"
+    )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the singleton Settings, parsing the environment only once."""
+    return Settings()
 
 
-# Global settings instance
-settings = Settings()
\ No newline at end of file
+# Global settings instance (backward-compatible shim over get_settings)
+settings = get_settings()
\ No newline at end of file
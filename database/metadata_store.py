@@ -0,0 +1,187 @@
+import os
+import sqlite3
+
+try:
+    import orjson as _json  # C parser; markedly faster on large legacy files
+except ImportError:
+    import json as _json
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class MetadataStore:
+    """SQLite-backed document metadata storage.
+
+    Replaces the documents_metadata.json file, whose every update rewrote
+    the entire metadata dict to disk — O(N) I/O per single-document change.
+    Here each change is one INSERT OR REPLACE, and listing is one SELECT.
+    """
+
+    _COLUMNS = (
+        "document_id", "filename", "file_path", "upload_date", "chunk_count",
+        "file_size", "page_count", "status", "error_message"
+    )
+
+    def __init__(self, db_path: str = "./documents_metadata.db",
+                 legacy_json_path: str = "./documents_metadata.json"):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(
+            db_path, isolation_level=None, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                document_id TEXT PRIMARY KEY,
+                filename TEXT,
+                file_path TEXT,
+                upload_date TEXT,
+                chunk_count INTEGER,
+                file_size INTEGER,
+                page_count INTEGER,
+                status TEXT,
+                error_message TEXT
+            )
+            """
+        )
+        # Content-hash -> embedding cache: byte-identical chunks (template
+        # boilerplate shared across uploads) skip the encoder entirely
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS chunk_hashes (
+                content_hash TEXT PRIMARY KEY,
+                embedding BLOB
+            )
+            """
+        )
+        self._migrate_legacy_json(legacy_json_path)
+
+    def _migrate_legacy_json(self, legacy_json_path: str):
+        """One-time import of the old JSON metadata file, if present."""
+        try:
+            if not os.path.exists(legacy_json_path):
+                return
+            count = self._conn.execute(
+                "SELECT COUNT(*) FROM documents"
+            ).fetchone()[0]
+            if count == 0:
+                with open(legacy_json_path, 'rb') as f:
+                    data = _json.loads(f.read())
+                for doc_id, metadata in data.items():
+                    metadata.setdefault("document_id", doc_id)
+                    self.upsert(metadata)
+                logger.info(f"Migrated {len(data)} documents from legacy JSON metadata")
+            os.rename(legacy_json_path, legacy_json_path + ".migrated")
+        except Exception as e:
+            logger.error(f"Error migrating legacy metadata file: {str(e)}")
+
+    @staticmethod
+    def _to_row_value(key: str, value: Any) -> Any:
+        if key == "upload_date" and isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    @staticmethod
+    def _from_row(row) -> Dict[str, Any]:
+        metadata = dict(zip(MetadataStore._COLUMNS, row))
+        if metadata.get("upload_date"):
+            try:
+                metadata["upload_date"] = datetime.fromisoformat(metadata["upload_date"])
+            except ValueError:
+                pass
+        if metadata.get("error_message") is None:
+            metadata.pop("error_message")
+        return metadata
+
+    def upsert(self, metadata: Dict[str, Any]):
+        """Insert or replace a single document's metadata row."""
+        try:
+            values = tuple(
+                self._to_row_value(col, metadata.get(col)) for col in self._COLUMNS
+            )
+            with self._lock:
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO documents ({', '.join(self._COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(self._COLUMNS))})",
+                    values
+                )
+        except Exception as e:
+            logger.error(f"Error saving document metadata: {str(e)}")
+
+    def get(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """Get metadata for a single document."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM documents "
+                "WHERE document_id = ?",
+                (document_id,)
+            ).fetchone()
+        return self._from_row(row) if row else None
+
+    def list(self) -> List[Dict[str, Any]]:
+        """List metadata for all documents."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM documents"
+            ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def delete(self, document_id: str) -> bool:
+        """Delete a document's metadata row; returns whether a row existed."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM documents WHERE document_id = ?", (document_id,)
+            )
+        return cursor.rowcount > 0
+
+    def get_chunk_embeddings(self, hashes: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Look up stored embeddings for the given content hashes.
+
+        Returns only the hashes that are present; queries in batches to stay
+        under SQLite's host-parameter limit.
+        """
+        unique = list(dict.fromkeys(hashes))
+        found: Dict[str, np.ndarray] = {}
+        try:
+            with self._lock:
+                for i in range(0, len(unique), 500):
+                    batch = unique[i:i + 500]
+                    rows = self._conn.execute(
+                        "SELECT content_hash, embedding FROM chunk_hashes "
+                        f"WHERE content_hash IN ({', '.join('?' * len(batch))})",
+                        batch
+                    ).fetchall()
+                    for content_hash, blob in rows:
+                        found[content_hash] = np.frombuffer(blob, dtype=np.float32)
+        except Exception as e:
+            logger.error(f"Error reading chunk embedding cache: {str(e)}")
+        return found
+
+    def put_chunk_embeddings(self, embeddings: Dict[str, np.ndarray]):
+        """Store embeddings keyed by content hash (replacing existing rows)."""
+        try:
+            rows = [
+                (content_hash, np.asarray(vector, dtype=np.float32).tobytes())
+                for content_hash, vector in embeddings.items()
+            ]
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO chunk_hashes (content_hash, embedding) "
+                    "VALUES (?, ?)",
+                    rows
+                )
+        except Exception as e:
+            logger.error(f"Error writing chunk embedding cache: {str(e)}")
+
+    def count(self) -> int:
+        """Number of documents with stored metadata."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
@@ -1,14 +1,41 @@
 import os
 import json
+import sqlite3
 import uuid
-from typing import List, Dict, Any, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Union
+import numpy as np
 import chromadb
 from chromadb.config import Settings
 from langchain.schema import Document
 import logging
 
+from config import settings
+
 logger = logging.getLogger(__name__)
 
+# Per-worker-process ChromaDB collection cache; each ingest worker opens its
+# own PersistentClient once and reuses it across shards
+_worker_collections: Dict[Tuple[str, str], Any] = {}
+
+
+def _add_shard_worker(persist_directory, collection_name, ids, embeddings, texts, metadatas):
+    """Insert one shard of chunks from a dedicated worker process."""
+    key = (persist_directory, collection_name)
+    collection = _worker_collections.get(key)
+    if collection is None:
+        client = chromadb.PersistentClient(path=persist_directory)
+        collection = client.get_or_create_collection(name=collection_name)
+        _worker_collections[key] = collection
+
+    collection.add(
+        ids=ids,
+        embeddings=embeddings,
+        documents=texts,
+        metadatas=metadatas
+    )
+    return len(ids)
+
 
 class VectorStore:
     def __init__(self, persist_directory: str = "./chroma_db"):
@@ -16,7 +43,12 @@ class VectorStore:
         self.client = None
         self.collection = None
         self.collection_name = "pdf_documents"
+        # Monotonic version bumped on every mutation; cached aggregate results
+        # are keyed on it so repeated polling is served without recomputation
+        self._version = 0
+        self._result_cache: Dict[str, Tuple[int, Any]] = {}
         self._initialize_client()
+        self._initialize_document_index()
 
     def _initialize_client(self):
         """Initialize ChromaDB client."""
@@ -26,117 +58,688 @@ class VectorStore:
             
             # Initialize ChromaDB client with persistence
             self.client = chromadb.PersistentClient(path=self.persist_directory)
-            
-            # Get or create collection
+
+            # Tune SQLite for bulk ingestion (per-insert fsync dominates add() cost)
+            self._tune_sqlite()
+
+            # Get or create collection with tuned HNSW parameters; inner
+            # product on normalized embeddings is the cheapest distance, and a
+            # raised sync_threshold avoids rewriting the index to disk on
+            # every batch
             self.collection = self.client.get_or_create_collection(
                 name=self.collection_name,
-                metadata={"description": "PDF document chunks with embeddings"}
+                metadata=self._collection_metadata()
             )
             
+            self._search_ef = settings.hnsw_ef_search
+            self._ef_request_logged = False
+            # The distance space is fixed when a collection is first created;
+            # a pre-existing store may record a different space than the
+            # configured default (Chroma's own default is l2), so read back
+            # what this collection actually uses
+            self._space = (self.collection.metadata or {}).get("hnsw:space", "l2")
+
             logger.info(f"ChromaDB initialized with collection: {self.collection_name}")
             
         except Exception as e:
             logger.error(f"Error initializing ChromaDB: {str(e)}")
             raise
 
-    def add_documents(self, documents: List[Document], embeddings: List[List[float]]) -> bool:
-        """Add documents with embeddings to the vector store."""
+    @staticmethod
+    def _collection_metadata() -> Dict[str, Any]:
+        """Collection metadata with the currently configured HNSW tuning."""
+        return {
+            "description": "PDF document chunks with embeddings",
+            "hnsw:space": settings.hnsw_space,
+            "hnsw:M": settings.hnsw_m,
+            "hnsw:construction_ef": settings.hnsw_ef_construction,
+            "hnsw:search_ef": settings.hnsw_ef_search,
+            "hnsw:batch_size": settings.hnsw_batch_size,
+            "hnsw:sync_threshold": settings.hnsw_sync_threshold,
+        }
+
+    def _sqlite_connection(self):
+        """Get the underlying SQLite connection of the persistent client."""
+        return self.client._system.instance(chromadb.db.system.SysDB)._conn_pool.connect()
+
+    def _tune_sqlite(self):
+        """Apply SQLite pragmas that cut per-insert durability overhead.
+
+        The defaults pay fsync/WAL cost on every collection.add. PDFs can
+        always be re-ingested, so relaxed durability is acceptable here; the
+        aggressive variants are opt-in via chroma_unsafe_fast_ingest.
+        """
+        try:
+            conn = self._sqlite_connection()
+            cursor = conn.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA temp_store=memory")
+            cursor.execute("PRAGMA mmap_size=268435456")
+            if settings.chroma_unsafe_fast_ingest:
+                cursor.execute("PRAGMA synchronous=OFF")
+                cursor.execute("PRAGMA locking_mode=EXCLUSIVE")
+            logger.info("Applied SQLite ingestion pragmas")
+        except Exception as e:
+            # Pragmas are best-effort; ChromaDB internals may change between versions
+            logger.warning(f"Could not apply SQLite pragmas: {str(e)}")
+
+    def _initialize_document_index(self):
+        """Initialize the per-document summary index.
+
+        Listing documents by scanning every chunk's metadata is O(N) in the
+        number of chunks; this small table keeps one aggregated row per
+        document so list_documents and get_collection_stats stay O(documents).
+        """
+        try:
+            index_path = os.path.join(self.persist_directory, "documents_index.sqlite3")
+            self._index_conn = sqlite3.connect(index_path, check_same_thread=False)
+            self._index_conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    document_id TEXT PRIMARY KEY,
+                    filename TEXT,
+                    file_size INTEGER,
+                    text_length INTEGER,
+                    chunk_count INTEGER
+                )
+                """
+            )
+            # fp16 embedding mirror: chunk_id -> fixed-width row in a flat
+            # binary file, memory-mapped on read. Half the bytes of fp32 and
+            # enough precision for MiniLM-scale similarities; lets
+            # rebuild_vector_store repopulate a fresh index without
+            # re-running the encoder.
+            self._index_conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embedding_mirror (
+                    chunk_id TEXT PRIMARY KEY,
+                    row INTEGER,
+                    dim INTEGER
+                )
+                """
+            )
+            self._index_conn.commit()
+            self._mirror_path = os.path.join(
+                self.persist_directory, "embeddings_fp16.bin"
+            )
+            self._backfill_document_index()
+        except Exception as e:
+            logger.error(f"Error initializing document index: {str(e)}")
+            raise
+
+    def _backfill_document_index(self):
+        """Rebuild the document index from chunk metadata if it is out of date."""
+        try:
+            indexed = self._index_conn.execute(
+                "SELECT COALESCE(SUM(chunk_count), 0) FROM documents"
+            ).fetchone()[0]
+            if indexed == self.collection.count():
+                return
+
+            self._index_conn.execute("DELETE FROM documents")
+            results = self.collection.get(include=["metadatas"])
+            if results and results['metadatas']:
+                for metadata in results['metadatas']:
+                    doc_id = metadata.get('document_id')
+                    if doc_id:
+                        self._index_document(
+                            doc_id,
+                            metadata.get('filename', 'Unknown'),
+                            metadata.get('file_size', 0),
+                            metadata.get('text_length', 0),
+                            1
+                        )
+            self._index_conn.commit()
+            logger.info("Rebuilt document index from chunk metadata")
+        except Exception as e:
+            logger.warning(f"Could not backfill document index: {str(e)}")
+
+    def _index_document(self, document_id, filename, file_size, text_length, chunk_count):
+        """Upsert a document row, accumulating its chunk count."""
+        self._index_conn.execute(
+            """
+            INSERT INTO documents (document_id, filename, file_size, text_length, chunk_count)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(document_id) DO UPDATE SET chunk_count = chunk_count + excluded.chunk_count
+            """,
+            (document_id, filename, file_size, text_length, chunk_count)
+        )
+
+    @staticmethod
+    def _where_for(document_id: Optional[str]) -> Optional[Dict[str, str]]:
+        """Build the where clause for an optional document_id filter.
+
+        Passed straight to collection.query/get so ChromaDB restricts the
+        candidate set index-side before distance computation; single-document
+        questions touch only that document's vectors rather than the whole
+        collection followed by a Python-side filter.
+        """
+        return {"document_id": document_id} if document_id else None
+
+    def _reload_collection(self):
+        """Re-open the client and collection to pick up out-of-process writes."""
+        self.client = chromadb.PersistentClient(path=self.persist_directory)
+        self.collection = self.client.get_or_create_collection(
+            name=self.collection_name,
+            metadata=self._collection_metadata()
+        )
+        self._space = (self.collection.metadata or {}).get("hnsw:space", "l2")
+
+    def distances_to_similarities(self, distances: np.ndarray) -> np.ndarray:
+        """Map this collection's native distances to cosine similarities.
+
+        On unit vectors an l2 collection returns squared L2 = 2 - 2*cos, so
+        cosine = 1 - d/2; cosine and ip collections return 1 - cos, so
+        cosine = 1 - d. Branching on the recorded space keeps similarities
+        correct for stores created before the ip default.
+        """
+        if self._space == "l2":
+            return np.maximum(0.0, 1.0 - distances * 0.5)
+        return np.maximum(0.0, 1.0 - distances)
+
+    def _cached(self, name: str, compute):
+        """Return a cached result for `name` unless the store has changed."""
+        cached = self._result_cache.get(name)
+        if cached is not None and cached[0] == self._version:
+            return cached[1]
+        result = compute()
+        self._result_cache[name] = (self._version, result)
+        return result
+
+    def flush(self):
+        """Checkpoint the SQLite WAL so bulk-ingested data hits the main DB file."""
+        try:
+            conn = self._sqlite_connection()
+            conn.cursor().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            logger.debug("WAL checkpoint completed")
+        except Exception as e:
+            logger.warning(f"Could not checkpoint WAL: {str(e)}")
+
+    def add_documents(
+        self,
+        documents: List[Document],
+        embeddings: Union[List[List[float]], np.ndarray],
+        batch_size: Optional[int] = None
+    ) -> bool:
+        """Add documents with embeddings to the vector store in batches."""
         try:
             if len(documents) != len(embeddings):
                 raise ValueError("Number of documents must match number of embeddings")
 
-            # Prepare data for ChromaDB
-            ids = []
-            metadatas = []
-            texts = []
-
-            for i, doc in enumerate(documents):
-                # Generate unique ID for each chunk
-                chunk_id = str(uuid.uuid4())
-                ids.append(chunk_id)
-                
-                # Prepare metadata (ChromaDB requires serializable values)
-                metadata = doc.metadata.copy()
-                metadata["chunk_id"] = chunk_id
-                
-                # Ensure all metadata values are serializable
-                for key, value in metadata.items():
-                    if not isinstance(value, (str, int, float, bool)):
-                        metadata[key] = str(value)
-                
-                metadatas.append(metadata)
-                texts.append(doc.page_content)
-
-            # Add to ChromaDB
-            self.collection.add(
-                ids=ids,
-                embeddings=embeddings,
-                documents=texts,
-                metadatas=metadatas
+            if batch_size is None:
+                batch_size = settings.chroma_batch_size
+
+            # Pack embeddings into one contiguous array up front; Python float
+            # lists are ~7x larger and cost per-element boxing on every slice
+            # handed to ChromaDB. float16 halves the bytes moved again and is
+            # lossless at MiniLM-scale similarity precision (opt-in setting).
+            storage_dtype = (
+                np.float16 if settings.embedding_storage_precision == "float16"
+                else np.float32
             )
+            embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+
+            # Unit-normalize at ingest: with the collection in inner-product
+            # space, distance = 1 - dot, so every comparison skips the norm
+            # division. The encoder already normalizes, making this a cheap
+            # no-op guard against a future backend that does not.
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            np.clip(norms, 1e-12, None, out=norms)
+            embeddings /= norms
+            if storage_dtype is not np.float32:
+                embeddings = embeddings.astype(storage_dtype)
+
+            # Generate unique IDs for all chunks up front
+            ids = [uuid.uuid4().hex for _ in documents]
+
+            # Prepare data for ChromaDB; metadata values are already coerced to
+            # serializable scalars at chunk-creation time
+            metadatas = [
+                {**doc.metadata, "chunk_id": chunk_id}
+                for chunk_id, doc in zip(ids, documents)
+            ]
+            texts = [doc.page_content for doc in documents]
 
-            logger.info(f"Added {len(documents)} documents to vector store")
+            # Add to ChromaDB in batches; both very small and very large payloads
+            # hurt insert throughput, so the batch size is an operator-tunable knob
+            workers = settings.ingest_workers
+            if workers > 1 and settings.chroma_unsafe_fast_ingest:
+                # The unsafe pragmas take an EXCLUSIVE lock on this process's
+                # connection, which would make every worker fail with
+                # "database is locked" — the two settings cannot combine
+                logger.warning(
+                    "ingest_workers > 1 is incompatible with "
+                    "chroma_unsafe_fast_ingest (EXCLUSIVE lock); ingesting serially"
+                )
+                workers = 1
+            if workers > 1 and len(ids) > batch_size:
+                # A single client serializes inserts under the GIL; shard batches
+                # across worker processes, each holding its own PersistentClient
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = [
+                        executor.submit(
+                            _add_shard_worker,
+                            self.persist_directory,
+                            self.collection_name,
+                            ids[i:i + batch_size],
+                            embeddings[i:i + batch_size],
+                            texts[i:i + batch_size],
+                            metadatas[i:i + batch_size]
+                        )
+                        for i in range(0, len(ids), batch_size)
+                    ]
+                    for future in futures:
+                        future.result()
+                # Embedded ChromaDB is not multi-process aware: this
+                # process's client still holds its old in-memory HNSW
+                # segment and would never see the workers' rows. Re-open
+                # the client so queries pick them up immediately.
+                self._reload_collection()
+            else:
+                for i in range(0, len(ids), batch_size):
+                    self.collection.add(
+                        ids=ids[i:i + batch_size],
+                        embeddings=embeddings[i:i + batch_size],
+                        documents=texts[i:i + batch_size],
+                        metadatas=metadatas[i:i + batch_size]
+                    )
+
+            # Mirror the new embeddings to the fp16 sidecar file
+            self._mirror_append(ids, embeddings)
+
+            # Keep the per-document summary index in sync
+            counts: Dict[str, Dict[str, Any]] = {}
+            for metadata in metadatas:
+                doc_id = metadata.get('document_id')
+                if doc_id:
+                    entry = counts.setdefault(doc_id, {
+                        "filename": metadata.get('filename', 'Unknown'),
+                        "file_size": metadata.get('file_size', 0),
+                        "text_length": metadata.get('text_length', 0),
+                        "chunk_count": 0
+                    })
+                    entry["chunk_count"] += 1
+            for doc_id, entry in counts.items():
+                self._index_document(
+                    doc_id, entry["filename"], entry["file_size"],
+                    entry["text_length"], entry["chunk_count"]
+                )
+            self._index_conn.commit()
+            self._version += 1
+
+            logger.info(f"Added {len(documents)} documents to vector store in batches of {batch_size}")
             return True
 
         except Exception as e:
             logger.error(f"Error adding documents to vector store: {str(e)}")
             raise
 
+    def _mirror_append(self, ids: List[str], embeddings: np.ndarray):
+        """Append fp16 copies of new embeddings to the flat mirror file.
+
+        Rows are fixed-width, so chunk_id -> row number is enough to mmap
+        any embedding back without parsing. The mirror is best-effort: a
+        failure here never fails the ingest, it only degrades
+        rebuild_vector_store to re-encoding.
+        """
+        try:
+            emb16 = np.ascontiguousarray(embeddings, dtype=np.float16)
+            dim = emb16.shape[1]
+            # Derive the next row from the file size so rows deleted from the
+            # table (which leave holes in the file) are never overwritten
+            size = os.path.getsize(self._mirror_path) \
+                if os.path.exists(self._mirror_path) else 0
+            first_row = size // (2 * dim)
+            with open(self._mirror_path, "ab") as f:
+                f.write(emb16.tobytes())
+            self._index_conn.executemany(
+                "INSERT OR REPLACE INTO embedding_mirror (chunk_id, row, dim) "
+                "VALUES (?, ?, ?)",
+                [(id_, first_row + i, dim) for i, id_ in enumerate(ids)]
+            )
+            self._index_conn.commit()
+        except Exception as e:
+            logger.warning(f"Could not mirror embeddings to fp16 file: {str(e)}")
+
+    def rebuild_vector_store(self, batch_size: Optional[int] = None) -> bool:
+        """Rebuild the collection from mirrored embeddings, skipping the encoder.
+
+        Reads chunk texts and metadata out of the current collection, drops
+        it, recreates it with the currently configured HNSW parameters and
+        bulk-inserts with embeddings memory-mapped from the fp16 mirror —
+        re-indexing cost only, no model forward passes. Useful after tuning
+        hnsw:M/construction_ef or migrating the persist directory. Refuses
+        to run when any chunk predates the mirror (no fp16 row) rather
+        than silently dropping it.
+        """
+        try:
+            if batch_size is None:
+                batch_size = settings.chroma_batch_size
+
+            rows = self._index_conn.execute(
+                "SELECT chunk_id, row, dim FROM embedding_mirror"
+            ).fetchall()
+            if not rows:
+                logger.warning("No mirrored embeddings; nothing to rebuild from")
+                return False
+            row_for = {chunk_id: row for chunk_id, row, _ in rows}
+            dim = rows[0][2]
+            mirror = np.memmap(
+                self._mirror_path, dtype=np.float16, mode="r"
+            ).reshape(-1, dim)
+
+            existing = self.collection.get(include=["documents", "metadatas"])
+            ids = [i for i in existing["ids"] if i in row_for]
+            unmirrored = len(existing["ids"]) - len(ids)
+            if unmirrored:
+                # Chunks ingested before the mirror existed have no fp16
+                # row; dropping the collection now would destroy them, so
+                # bail out before touching anything
+                logger.error(
+                    f"Refusing to rebuild: {unmirrored} chunks have no "
+                    f"mirrored embedding (ingested before the fp16 mirror "
+                    f"existed); re-ingest their documents first"
+                )
+                return False
+            by_id = {
+                id_: (content, metadata)
+                for id_, content, metadata in zip(
+                    existing["ids"], existing["documents"], existing["metadatas"]
+                )
+            }
+
+            self.client.delete_collection(self.collection_name)
+            self.collection = self.client.create_collection(
+                name=self.collection_name,
+                metadata=self._collection_metadata()
+            )
+            self._search_ef = settings.hnsw_ef_search
+            self._space = settings.hnsw_space
+            self._ef_request_logged = False
+
+            for start in range(0, len(ids), batch_size):
+                batch_ids = ids[start:start + batch_size]
+                # Fancy-index the mmap per batch; only these rows are paged in
+                embeddings = np.asarray(
+                    mirror[[row_for[id_] for id_ in batch_ids]], dtype=np.float32
+                )
+                self.collection.add(
+                    ids=batch_ids,
+                    embeddings=embeddings,
+                    documents=[by_id[id_][0] for id_ in batch_ids],
+                    metadatas=[by_id[id_][1] for id_ in batch_ids]
+                )
+
+            self._version += 1
+            logger.info(f"Rebuilt vector store with {len(ids)} mirrored embeddings")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error rebuilding vector store: {str(e)}")
+            raise
+
     def similarity_search(
-        self, 
-        query_embedding: List[float], 
+        self,
+        query_embedding: Union[List[float], np.ndarray],
         k: int = 5,
-        document_id: Optional[str] = None
+        document_id: Optional[str] = None,
+        include_documents: bool = True
     ) -> List[Dict[str, Any]]:
         """Search for similar documents using embedding similarity."""
+        return self.similarity_search_batch(
+            np.atleast_2d(np.asarray(query_embedding, dtype=np.float32)),
+            k=k,
+            document_id=document_id,
+            include_documents=include_documents
+        )[0]
+
+    def similarity_search_batch(
+        self,
+        query_embeddings: Union[List[List[float]], np.ndarray],
+        k: int = 5,
+        document_id: Optional[str] = None,
+        include_documents: bool = True
+    ) -> List[List[Dict[str, Any]]]:
+        """Search for similar documents for several queries in one ChromaDB call.
+
+        Issuing Q queries through a single collection.query amortizes the
+        per-call Python and SQLite overhead across all of them. With
+        include_documents=False the full chunk texts stay in the database
+        (content is None in the results); callers that only need metadata
+        and distances skip the dominant payload cost and can hydrate the
+        few chunks they actually use via get_contents.
+        """
         try:
-            # Prepare where clause for filtering by document_id if provided
-            where_clause = None
-            if document_id:
-                where_clause = {"document_id": document_id}
+            query_embeddings = np.ascontiguousarray(query_embeddings, dtype=np.float32)
+
+            # Give the graph traversal enough candidates for large k; ef_search
+            # below ~4k degrades recall noticeably at negligible latency cost
+            self.set_search_ef(max(settings.hnsw_ef_search, 4 * k))
 
-            # Query ChromaDB
+            include = ["metadatas", "distances"]
+            if include_documents:
+                include.append("documents")
+
+            # Query ChromaDB once for all queries
             results = self.collection.query(
-                query_embeddings=[query_embedding],
+                query_embeddings=query_embeddings,
                 n_results=k,
-                where=where_clause
+                where=self._where_for(document_id),
+                include=include
             )
 
-            # Format results
-            search_results = []
-            if results and results['documents'] and results['documents'][0]:
-                for i in range(len(results['documents'][0])):
-                    result = {
-                        "id": results['ids'][0][i],
-                        "content": results['documents'][0][i],
-                        "metadata": results['metadatas'][0][i],
-                        "distance": results['distances'][0][i] if 'distances' in results else None
-                    }
-                    search_results.append(result)
+            # Format results with zip comprehensions (one list per query);
+            # avoids per-element index lookups into the parallel result lists
+            ids_lists = results['ids']
+            docs_lists = results.get('documents') or [[None] * len(i) for i in ids_lists]
+            metas_lists = results['metadatas']
+            dists_lists = results.get('distances') or [[None] * len(i) for i in ids_lists]
+
+            all_results = [
+                [
+                    {"id": id_, "content": content, "metadata": metadata, "distance": distance}
+                    for id_, content, metadata, distance in zip(ids_, docs, metas, dists)
+                ]
+                for ids_, docs, metas, dists in zip(ids_lists, docs_lists, metas_lists, dists_lists)
+            ]
 
-            logger.info(f"Found {len(search_results)} similar documents")
-            return search_results
+            logger.info(
+                f"Found {sum(len(r) for r in all_results)} similar documents "
+                f"for {len(all_results)} queries"
+            )
+            return all_results
 
         except Exception as e:
             logger.error(f"Error searching vector store: {str(e)}")
             raise
 
+    def similarity_search_reranked(
+        self,
+        query_embedding: Union[List[float], np.ndarray],
+        k: int = 5,
+        candidates: Optional[int] = None,
+        document_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """ANN-retrieve a wide candidate set, then rerank with exact cosine.
+
+        The HNSW traversal returns approximate neighbors; pulling `candidates`
+        (default settings.rerank_candidates) of them with their embeddings and
+        rescoring against the query is a single BLAS matvec — microseconds for
+        50x384 floats — and recovers any neighbors the graph ranked slightly
+        out of order. Embeddings are unit-normalized at encode time, so the
+        dot product is the cosine similarity. Results carry distances in the
+        collection's native space and no content, matching what
+        similarity_search(include_documents=False) returns.
+        """
+        try:
+            if candidates is None:
+                candidates = settings.rerank_candidates
+            candidates = max(candidates, k)
+
+            query = np.ascontiguousarray(query_embedding, dtype=np.float32)
+            self.set_search_ef(max(settings.hnsw_ef_search, 2 * candidates))
+
+            results = self.collection.query(
+                query_embeddings=query[None, :],
+                n_results=candidates,
+                where=self._where_for(document_id),
+                include=["metadatas", "embeddings"]
+            )
+
+            ids = results['ids'][0]
+            if not ids:
+                return []
+            metas = results['metadatas'][0]
+            cand = np.asarray(results['embeddings'][0], dtype=np.float32)
+
+            sims = cand @ query
+
+            k = min(k, len(sims))
+            top = np.argpartition(-sims, k - 1)[:k]
+            top = top[np.argsort(-sims[top])]
+
+            # Report distances in the collection's native space so downstream
+            # conversion through distances_to_similarities stays uniform
+            if self._space == "l2":
+                dists = 2.0 - 2.0 * sims
+            else:
+                dists = 1.0 - sims
+
+            reranked = [
+                {
+                    "id": ids[i],
+                    "content": None,
+                    "metadata": metas[i],
+                    "distance": float(dists[i])
+                }
+                for i in top
+            ]
+
+            logger.info(
+                f"Reranked {len(ids)} candidates down to {len(reranked)} results"
+            )
+            return reranked
+
+        except Exception as e:
+            logger.error(f"Error in reranked search: {str(e)}")
+            raise
+
+    def _build_compressed_mirror(self) -> Dict[str, Any]:
+        """Build an int8-quantized in-memory mirror of all stored embeddings.
+
+        Embeddings are L2-normalized at encode time, so a symmetric 127
+        scale preserves dot-product ordering to int8 precision. The mirror
+        holds 1 byte per dimension instead of 4, a 4x reduction in resident
+        memory for brute-force scans; it is version-keyed through _cached so
+        any mutation invalidates it.
+        """
+        results = self.collection.get(include=["embeddings"])
+        embeddings = np.asarray(results.get("embeddings"), dtype=np.float32)
+        if embeddings.size == 0:
+            return {"ids": [], "codes": np.empty((0, 0), dtype=np.int8)}
+        codes = np.clip(np.round(embeddings * 127), -128, 127).astype(np.int8)
+        return {"ids": results["ids"], "codes": codes}
+
+    def similarity_search_compressed(
+        self,
+        query_embedding: Union[List[float], np.ndarray],
+        k: int = 5
+    ) -> List[Dict[str, Any]]:
+        """Brute-force search over the compressed mirror.
+
+        Scans int8 codes blockwise (casting one block at a time so the
+        float32 temporary stays cache-sized) and fetches the winning chunks
+        from the collection afterwards. Useful as a whole-corpus scan path
+        that does not touch the HNSW index or the SQLite layer per query.
+        """
+        try:
+            mirror = self._cached("compressed_mirror", self._build_compressed_mirror)
+            codes = mirror["codes"]
+            if len(codes) == 0:
+                return []
+
+            query = np.asarray(query_embedding, dtype=np.float32)
+            sims = np.empty(len(codes), dtype=np.float32)
+            block = 8192
+            for start in range(0, len(codes), block):
+                stop = start + block
+                sims[start:stop] = codes[start:stop].astype(np.float32) @ query
+            sims /= 127.0
+
+            k = min(k, len(sims))
+            top = np.argpartition(-sims, k - 1)[:k]
+            top = top[np.argsort(-sims[top])]
+
+            top_ids = [mirror["ids"][i] for i in top]
+            fetched = self.collection.get(
+                ids=top_ids, include=["documents", "metadatas"]
+            )
+            by_id = {
+                id_: (content, metadata)
+                for id_, content, metadata in zip(
+                    fetched["ids"], fetched["documents"], fetched["metadatas"]
+                )
+            }
+            return [
+                {
+                    "id": id_,
+                    "content": by_id[id_][0],
+                    "metadata": by_id[id_][1],
+                    "similarity": float(sims[i])
+                }
+                for id_, i in zip(top_ids, top)
+                if id_ in by_id
+            ]
+
+        except Exception as e:
+            logger.error(f"Error searching compressed mirror: {str(e)}")
+            raise
+
+    def get_contents(self, ids: List[str]) -> Dict[str, str]:
+        """Fetch full chunk texts for specific chunk ids."""
+        try:
+            results = self.collection.get(ids=list(ids), include=["documents"])
+            return dict(zip(results["ids"], results["documents"]))
+        except Exception as e:
+            logger.error(f"Error fetching chunk contents: {str(e)}")
+            raise
+
+    def set_search_ef(self, ef: int):
+        """Note a request for a wider query-time candidate list.
+
+        hnsw:search_ef is fixed when a collection is created: depending on
+        the ChromaDB version, collection.modify either rejects hnsw:* keys
+        or replaces the metadata wholesale (clobbering the other persisted
+        settings), so post-creation widening is deliberately not attempted.
+        A request wider than the built value is logged once per process so
+        operators can raise hnsw_ef_search and rebuild_vector_store().
+        """
+        if ef <= self._search_ef or self._ef_request_logged:
+            return
+        self._ef_request_logged = True
+        logger.info(
+            f"search_ef {ef} requested but collection was built with "
+            f"{self._search_ef}; raise hnsw_ef_search and rebuild to apply"
+        )
+
     def get_documents_by_id(self, document_id: str) -> List[Dict[str, Any]]:
         """Get all chunks for a specific document."""
         try:
+            # Only documents and metadatas are used; skip fetching embeddings
             results = self.collection.get(
-                where={"document_id": document_id}
+                where=self._where_for(document_id),
+                include=["documents", "metadatas"]
             )
 
             documents = []
-            if results and results['documents']:
-                for i in range(len(results['documents'])):
-                    doc = {
-                        "id": results['ids'][i],
-                        "content": results['documents'][i],
-                        "metadata": results['metadatas'][i]
-                    }
-                    documents.append(doc)
+            if results and results.get('documents'):
+                documents = [
+                    {"id": id_, "content": content, "metadata": metadata}
+                    for id_, content, metadata in zip(
+                        results['ids'], results['documents'], results['metadatas']
+                    )
+                ]
 
             logger.info(f"Retrieved {len(documents)} chunks for document {document_id}")
             return documents
@@ -148,14 +751,27 @@ class VectorStore:
     def delete_document(self, document_id: str) -> bool:
         """Delete all chunks for a specific document."""
         try:
-            # Get all chunk IDs for the document
+            # Get all chunk IDs for the document; IDs are always returned, so
+            # skip deserializing documents, metadatas and embeddings entirely
             results = self.collection.get(
-                where={"document_id": document_id}
+                where=self._where_for(document_id),
+                include=[]
             )
 
-            if results and results['ids']:
+            if results and results.get('ids'):
                 # Delete all chunks
                 self.collection.delete(ids=results['ids'])
+                self._index_conn.execute(
+                    "DELETE FROM documents WHERE document_id = ?", (document_id,)
+                )
+                # Drop mirror rows too; their bytes stay as holes in the flat
+                # file until the next rebuild, which only follows live rows
+                self._index_conn.executemany(
+                    "DELETE FROM embedding_mirror WHERE chunk_id = ?",
+                    [(id_,) for id_ in results['ids']]
+                )
+                self._index_conn.commit()
+                self._version += 1
                 logger.info(f"Deleted {len(results['ids'])} chunks for document {document_id}")
                 return True
             else:
@@ -169,61 +785,76 @@ class VectorStore:
     def list_documents(self) -> List[Dict[str, Any]]:
         """List all unique documents in the vector store."""
         try:
-            # Get all documents
-            results = self.collection.get()
-            
-            # Group by document_id
-            documents = {}
-            if results and results['metadatas']:
-                for metadata in results['metadatas']:
-                    doc_id = metadata.get('document_id')
-                    if doc_id and doc_id not in documents:
-                        documents[doc_id] = {
-                            "document_id": doc_id,
-                            "filename": metadata.get('filename', 'Unknown'),
-                            "chunk_count": 0,
-                            "file_size": metadata.get('file_size', 0),
-                            "text_length": metadata.get('text_length', 0)
-                        }
-                    if doc_id:
-                        documents[doc_id]["chunk_count"] += 1
-
-            return list(documents.values())
-
+            return self._cached("list_documents", self._list_documents_uncached)
         except Exception as e:
             logger.error(f"Error listing documents: {str(e)}")
             raise
 
+    def _list_documents_uncached(self) -> List[Dict[str, Any]]:
+        rows = self._index_conn.execute(
+            "SELECT document_id, filename, file_size, text_length, chunk_count FROM documents"
+        ).fetchall()
+
+        return [
+            {
+                "document_id": doc_id,
+                "filename": filename,
+                "chunk_count": chunk_count,
+                "file_size": file_size,
+                "text_length": text_length
+            }
+            for doc_id, filename, file_size, text_length, chunk_count in rows
+        ]
+
     def get_collection_stats(self) -> Dict[str, Any]:
         """Get statistics about the vector store collection."""
         try:
-            count = self.collection.count()
-            
-            # Get unique documents count
-            documents = self.list_documents()
-            
-            stats = {
-                "total_chunks": count,
-                "total_documents": len(documents),
-                "collection_name": self.collection_name,
-                "persist_directory": self.persist_directory
-            }
-
-            return stats
-
+            return self._cached("collection_stats", self._get_collection_stats_uncached)
         except Exception as e:
             logger.error(f"Error getting collection stats: {str(e)}")
             raise
 
+    def _get_collection_stats_uncached(self) -> Dict[str, Any]:
+        count = self.collection.count()
+
+        # Aggregate document count from the summary index
+        total_documents = self._index_conn.execute(
+            "SELECT COUNT(*) FROM documents"
+        ).fetchone()[0]
+
+        return {
+            "total_chunks": count,
+            "total_documents": total_documents,
+            "collection_name": self.collection_name,
+            "persist_directory": self.persist_directory,
+            # Surface index tuning so deployments can see what they run with
+            "hnsw": {
+                "space": settings.hnsw_space,
+                "M": settings.hnsw_m,
+                "construction_ef": settings.hnsw_ef_construction,
+                "search_ef": self._search_ef
+            }
+        }
+
     def reset_collection(self) -> bool:
         """Reset (clear) the entire collection."""
         try:
-            # Delete the collection and recreate it
+            # Delete the collection and recreate it with the configured
+            # HNSW tuning, exactly as at first initialization
             self.client.delete_collection(self.collection_name)
             self.collection = self.client.create_collection(
                 name=self.collection_name,
-                metadata={"description": "PDF document chunks with embeddings"}
+                metadata=self._collection_metadata()
             )
+            self._search_ef = settings.hnsw_ef_search
+            self._space = settings.hnsw_space
+            self._ef_request_logged = False
+            self._index_conn.execute("DELETE FROM documents")
+            self._index_conn.execute("DELETE FROM embedding_mirror")
+            self._index_conn.commit()
+            if os.path.exists(self._mirror_path):
+                os.remove(self._mirror_path)
+            self._version += 1
             logger.info("Vector store collection reset successfully")
             return True
 
@@ -1,24 +1,28 @@
 import os
 import uuid
 import asyncio
+import hashlib
 import shutil
 from pathlib import Path
 from typing import List, Optional
 from datetime import datetime, timedelta
 import time
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, File, UploadFile, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import ORJSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
+import aiofiles
 import uvicorn
 import logging
 
 from models.schemas import (
-    DocumentResponse, QuestionRequest, AnswerResponse, 
+    DocumentResponse, QuestionRequest, AnswerResponse,
+    BatchQuestionRequest, BatchAnswerResponse,
     DocumentListResponse, ErrorResponse, HealthResponse
 )
 from services.rag_service import RAGService
+from config import settings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -28,7 +32,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="PDFModel API",
     description="A FastAPI application for uploading PDFs and asking questions about their content using RAG",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -41,13 +46,25 @@ app.add_middleware(
 )
 
 # Global variables
-rag_service: RAGService = None
+rag_service: Optional[RAGService] = None
+rag_service_lock = asyncio.Lock()
 app_start_time = time.time()
 
+# Bounded ingestion queue consumed by a single persistent worker task; gives
+# backpressure (429 when full) instead of piling unbounded background tasks
+# onto the request workers
+ingest_queue: Optional[asyncio.Queue] = None
+ingest_worker_task: Optional[asyncio.Task] = None
+ingest_status: dict = {}
+
 # Configuration
 UPLOAD_DIR = Path("./uploads")
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
 ALLOWED_EXTENSIONS = {".pdf"}
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1MB read/write chunks while streaming uploads
+
+# Content hashes of already-ingested uploads (sha256 -> document_id)
+uploaded_hashes: dict = {}
 
 # Ensure upload directory exists
 UPLOAD_DIR.mkdir(exist_ok=True)
@@ -56,34 +73,75 @@ UPLOAD_DIR.mkdir(exist_ok=True)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 
+@app.middleware("http")
+async def enforce_upload_size(request, call_next):
+    """Reject oversized uploads from the Content-Length header before routing.
+
+    This short-circuits misbehaving clients before any of the body is read;
+    the streaming save still enforces the limit for chunked uploads that
+    omit Content-Length.
+    """
+    if request.method == "POST" and request.url.path == "/upload-pdf":
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > MAX_FILE_SIZE:
+            return ORJSONResponse(
+                status_code=413,
+                content={
+                    "detail": f"File too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)}MB",
+                    "error_code": "HTTP_413"
+                }
+            )
+    return await call_next(request)
+
+
+def _build_rag_service() -> RAGService:
+    """Construct the RAG service (loads models; runs in a worker thread)."""
+    return RAGService(
+        embedding_model="all-MiniLM-L6-v2",
+        chunk_size=1000,
+        chunk_overlap=200,
+        vector_store_path="./chroma_db"
+    )
+
+
 @app.on_event("startup")
 async def startup_event():
-    """Initialize services on startup."""
-    global rag_service
-    try:
-        logger.info("Initializing RAG service...")
-        rag_service = RAGService(
-            embedding_model="all-MiniLM-L6-v2",
-            chunk_size=1000,
-            chunk_overlap=200,
-            vector_store_path="./chroma_db"
-        )
-        logger.info("RAG service initialized successfully")
-    except Exception as e:
-        logger.error(f"Failed to initialize RAG service: {str(e)}")
-        raise
+    """Start the ingestion worker and optionally prewarm services."""
+    global ingest_queue, ingest_worker_task
+    ingest_queue = asyncio.Queue(maxsize=settings.ingest_queue_max)
+    ingest_worker_task = asyncio.create_task(ingest_worker())
+    if settings.eager_init:
+        await get_rag_service()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown."""
+    if ingest_worker_task is not None:
+        ingest_worker_task.cancel()
+    if rag_service is not None:
+        rag_service.save_query_cache()
     logger.info("Shutting down PDF QA application")
 
 
-def get_rag_service() -> RAGService:
-    """Dependency to get RAG service instance."""
+async def get_rag_service() -> RAGService:
+    """Dependency returning the RAG service, initializing it lazily.
+
+    Loading sentence-transformers + ChromaDB is expensive; deferring it keeps
+    process startup sub-second and /health cheap. Initialization runs in a
+    worker thread under a lock so concurrent first requests build it once.
+    """
+    global rag_service
     if rag_service is None:
-        raise HTTPException(status_code=500, detail="RAG service not initialized")
+        async with rag_service_lock:
+            if rag_service is None:
+                try:
+                    logger.info("Initializing RAG service...")
+                    rag_service = await asyncio.to_thread(_build_rag_service)
+                    logger.info("RAG service initialized successfully")
+                except Exception as e:
+                    logger.error(f"Failed to initialize RAG service: {str(e)}")
+                    raise HTTPException(status_code=500, detail="RAG service not initialized")
     return rag_service
 
 
@@ -105,44 +163,85 @@ def validate_pdf_file(file: UploadFile) -> None:
         )
 
 
-async def save_uploaded_file(file: UploadFile, document_id: str) -> str:
-    """Save uploaded file and return file path."""
+async def save_uploaded_file(file: UploadFile, document_id: str) -> tuple:
+    """Stream uploaded file to disk in bounded chunks.
+
+    Returns (file path, content hash). The hash is only recorded in
+    uploaded_hashes once ingestion succeeds, so a failed or deleted
+    document never blocks re-uploading the same PDF.
+    """
+    # Create filename with document ID to avoid conflicts
+    safe_filename = f"{document_id}_{file.filename}"
+    file_path = UPLOAD_DIR / safe_filename
+
     try:
-        # Create filename with document ID to avoid conflicts
-        file_ext = Path(file.filename).suffix.lower()
-        safe_filename = f"{document_id}_{file.filename}"
-        file_path = UPLOAD_DIR / safe_filename
-        
-        # Save file
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            
-            # Final file size check
-            if len(content) > MAX_FILE_SIZE:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"File too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)}MB"
-                )
-            
-            buffer.write(content)
-        
-        logger.info(f"Saved file: {file_path}")
-        return str(file_path)
-        
+        # Stream to disk so memory stays constant regardless of file size,
+        # rejecting the upload as soon as the size limit is crossed
+        total_size = 0
+        digest = hashlib.sha256()
+        async with aiofiles.open(file_path, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                # Check the PDF magic bytes before accepting the rest of the stream
+                if total_size == 0 and not chunk.startswith(b"%PDF-"):
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Invalid file type. Only PDF files are allowed."
+                    )
+                total_size += len(chunk)
+                if total_size > MAX_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"File too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)}MB"
+                    )
+                digest.update(chunk)
+                await buffer.write(chunk)
+
+        # Content-addressed dedup: the same PDF should not be ingested twice
+        content_hash = digest.hexdigest()
+        existing_id = uploaded_hashes.get(content_hash)
+        if existing_id:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Identical file already uploaded as document {existing_id}"
+            )
+
+        logger.info(f"Saved file: {file_path} ({total_size} bytes)")
+        return str(file_path), content_hash
+
     except HTTPException:
+        if file_path.exists():
+            file_path.unlink()
         raise
     except Exception as e:
         logger.error(f"Error saving file: {str(e)}")
+        if file_path.exists():
+            file_path.unlink()
         raise HTTPException(status_code=500, detail="Failed to save uploaded file")
 
 
-async def process_pdf_background(file_path: str, filename: str, document_id: str, rag_service: RAGService):
-    """Background task to process PDF."""
-    try:
-        await rag_service.process_and_store_pdf(file_path, filename, document_id)
-        logger.info(f"Background processing completed for document: {document_id}")
-    except Exception as e:
-        logger.error(f"Background processing failed for document {document_id}: {str(e)}")
+async def ingest_worker():
+    """Persistent consumer that processes queued PDF uploads one at a time."""
+    while True:
+        file_path, filename, document_id, content_hash = await ingest_queue.get()
+        try:
+            ingest_status[document_id]["status"] = "processing"
+            service = await get_rag_service()
+            await service.process_and_store_pdf(file_path, filename, document_id)
+            # The checkpoint issues synchronous SQLite I/O right after the
+            # bulk writes; keep it off the event loop like the ingest itself
+            await asyncio.to_thread(service.vector_store.flush)
+            # Record the content hash only now: a failed ingest must not
+            # block re-uploading the same PDF
+            uploaded_hashes[content_hash] = document_id
+            ingest_status.pop(document_id, None)
+            logger.info(f"Ingestion completed for document: {document_id}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            ingest_status[document_id]["status"] = "failed"
+            logger.error(f"Ingestion failed for document {document_id}: {str(e)}")
+        finally:
+            ingest_queue.task_done()
 
 
 @app.get("/")
@@ -162,47 +261,65 @@ async def health_check():
     )
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe - 503 until the RAG service has been initialized."""
+    if rag_service is None:
+        return ORJSONResponse(
+            status_code=503,
+            content={"status": "initializing"}
+        )
+    return {"status": "ready"}
+
+
 @app.post("/upload-pdf", response_model=DocumentResponse)
 async def upload_pdf(
-    background_tasks: BackgroundTasks,
-    file: UploadFile = File(...),
-    rag_service: RAGService = Depends(get_rag_service)
+    file: UploadFile = File(...)
 ):
     """
-    Upload and process a PDF file.
-    
-    The file will be processed in the background and its status can be checked
-    using the document ID returned in the response.
+    Upload and queue a PDF file for processing.
+
+    The file is processed by a dedicated ingestion worker and its status can
+    be checked using the document ID returned in the response. Returns 429
+    when the ingestion queue is full.
     """
     try:
         # Validate file
         validate_pdf_file(file)
-        
-        # Generate unique document ID
-        document_id = str(uuid.uuid4())
-        
+
+        # Generate unique document ID (hex form: 32 chars, no hyphens)
+        document_id = uuid.uuid4().hex
+
         # Save uploaded file
-        file_path = await save_uploaded_file(file, document_id)
-        
-        # Add background task for processing
-        background_tasks.add_task(
-            process_pdf_background,
-            file_path,
-            file.filename,
-            document_id,
-            rag_service
-        )
-        
+        file_path, content_hash = await save_uploaded_file(file, document_id)
+
+        # Enqueue for the ingestion worker; reject with backpressure if full
+        upload_date = datetime.now()
+        ingest_status[document_id] = {
+            "filename": file.filename,
+            "status": "queued",
+            "upload_date": upload_date
+        }
+        try:
+            ingest_queue.put_nowait((file_path, file.filename, document_id, content_hash))
+        except asyncio.QueueFull:
+            ingest_status.pop(document_id, None)
+            Path(file_path).unlink(missing_ok=True)
+            raise HTTPException(
+                status_code=429,
+                detail="Ingestion queue is full, try again later"
+            )
+
         # Return immediate response
         return DocumentResponse(
             id=document_id,
             filename=file.filename,
-            status="processing",
-            upload_date=datetime.now(),
+            status="queued",
+            upload_date=upload_date,
             chunk_count=None,
             file_size=None
         )
-        
+
     except HTTPException:
         raise
     except Exception as e:
@@ -235,6 +352,31 @@ async def ask_question(
         raise HTTPException(status_code=500, detail="Failed to process question")
 
 
+@app.post("/ask-questions", response_model=BatchAnswerResponse)
+async def ask_questions(
+    request: BatchQuestionRequest,
+    rag_service: RAGService = Depends(get_rag_service)
+):
+    """
+    Ask several questions about uploaded PDF content in one request.
+
+    All questions are encoded in a single model forward pass and answered
+    with one batched vector store query.
+    """
+    try:
+        results = await rag_service.answer_questions(
+            questions=request.questions,
+            document_id=request.document_id,
+            max_chunks=request.max_chunks
+        )
+
+        return BatchAnswerResponse(answers=[AnswerResponse(**result) for result in results])
+
+    except Exception as e:
+        logger.error(f"Error answering questions: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to process questions")
+
+
 @app.get("/documents", response_model=DocumentListResponse)
 async def list_documents(
     rag_service: RAGService = Depends(get_rag_service)
@@ -243,7 +385,7 @@ async def list_documents(
     List all uploaded documents with their processing status.
     """
     try:
-        documents_data = rag_service.list_documents()
+        documents_data = await asyncio.to_thread(rag_service.list_documents)
         
         documents = []
         for doc_data in documents_data:
@@ -276,8 +418,12 @@ async def get_document(
     Get details about a specific document.
     """
     try:
-        metadata = rag_service.get_document_metadata(document_id)
-        
+        metadata = await asyncio.to_thread(rag_service.get_document_metadata, document_id)
+
+        # Documents still waiting for (or in) ingestion only exist in the queue status
+        if not metadata:
+            metadata = ingest_status.get(document_id)
+
         if not metadata:
             raise HTTPException(status_code=404, detail="Document not found")
         
@@ -306,9 +452,13 @@ async def delete_document(
     Delete a document and all its associated data.
     """
     try:
-        success = rag_service.delete_document(document_id)
-        
+        success = await asyncio.to_thread(rag_service.delete_document, document_id)
+
         if success:
+            # Free the content hash so the same PDF can be uploaded again
+            for content_hash, doc_id in list(uploaded_hashes.items()):
+                if doc_id == document_id:
+                    uploaded_hashes.pop(content_hash, None)
             return {"message": f"Document {document_id} deleted successfully"}
         else:
             raise HTTPException(status_code=404, detail="Document not found")
@@ -320,6 +470,11 @@ async def delete_document(
         raise HTTPException(status_code=500, detail="Failed to delete document")
 
 
+# Short-TTL cache for /stats so dashboard pollers don't recompute aggregates
+_stats_cache = {"time": 0.0, "stats": None}
+STATS_CACHE_TTL = 1.0
+
+
 @app.get("/stats")
 async def get_stats(
     rag_service: RAGService = Depends(get_rag_service)
@@ -328,7 +483,13 @@ async def get_stats(
     Get system statistics.
     """
     try:
-        stats = rag_service.get_service_stats()
+        now = time.time()
+        if _stats_cache["stats"] is not None and now - _stats_cache["time"] < STATS_CACHE_TTL:
+            stats = dict(_stats_cache["stats"])
+        else:
+            stats = await asyncio.to_thread(rag_service.get_service_stats)
+            _stats_cache["time"] = now
+            _stats_cache["stats"] = dict(stats)
         stats["uptime"] = time.time() - app_start_time
         stats["upload_directory"] = str(UPLOAD_DIR)
         return stats
@@ -344,7 +505,7 @@ async def get_document_chunks(
 ):
     """Debug endpoint to see document chunks."""
     try:
-        chunks = rag_service.vector_store.get_documents_by_id(document_id)
+        chunks = await asyncio.to_thread(rag_service.vector_store.get_documents_by_id, document_id)
         return {"document_id": document_id, "chunks": chunks}
     except Exception as e:
         logger.error(f"Error getting chunks: {str(e)}")
@@ -358,13 +519,16 @@ async def debug_search(
     """Debug endpoint to test similarity search."""
     try:
         question = request.get("question", "")
-        question_embedding = rag_service.embedding_service.encode_query(question)
+        question_embedding = await asyncio.to_thread(
+            rag_service.embedding_service.encode_query, question
+        )
         
         # Search with very low threshold
-        search_results = rag_service.vector_store.similarity_search(
-            query_embedding=question_embedding,
-            k=5,
-            document_id=request.get("document_id")
+        search_results = await asyncio.to_thread(
+            rag_service.vector_store.similarity_search,
+            question_embedding,
+            5,
+            request.get("document_id")
         )
         
         return {
@@ -381,7 +545,7 @@ async def debug_search(
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Custom HTTP exception handler."""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail, "error_code": f"HTTP_{exc.status_code}"}
     )
@@ -391,7 +555,7 @@ async def http_exception_handler(request, exc):
 async def general_exception_handler(request, exc):
     """General exception handler for unexpected errors."""
     logger.error(f"Unexpected error: {str(exc)}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"detail": "Internal server error", "error_code": "INTERNAL_ERROR"}
     )
@@ -5,6 +5,7 @@ from enum import Enum
 
 
 class DocumentStatus(str, Enum):
+    QUEUED = "queued"
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
@@ -36,6 +37,16 @@ class AnswerResponse(BaseModel):
     document_id: Optional[str] = Field(None, description="Source document ID")
 
 
+class BatchQuestionRequest(BaseModel):
+    questions: List[str] = Field(..., min_length=1, max_length=20, description="Questions about the PDF content")
+    document_id: Optional[str] = Field(None, description="Specific document ID to search in")
+    max_chunks: int = Field(default=5, ge=1, le=10, description="Maximum number of relevant chunks per question")
+
+
+class BatchAnswerResponse(BaseModel):
+    answers: List[AnswerResponse] = Field(..., description="Answers in the same order as the questions")
+
+
 class ErrorResponse(BaseModel):
     detail: str = Field(..., description="Error message")
     error_code: Optional[str] = Field(None, description="Error code")
@@ -1,78 +1,214 @@
+import asyncio
+import hashlib
 import os
-from typing import List, Dict, Any
+import struct
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
 import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
 from langchain.schema import Document
 import logging
 
+from config import settings
+
 logger = logging.getLogger(__name__)
 
 
 class EmbeddingService:
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        device: Optional[str] = None,
+        fp16: Optional[bool] = None,
+        precision: Optional[str] = None
+    ):
         """
         Initialize embedding service with sentence-transformers model.
-        
+
         Args:
             model_name: Name of the sentence-transformers model to use
                        Options: 'all-MiniLM-L6-v2' (fast, good quality)
                                'all-mpnet-base-v2' (slower, better quality)
                                'multi-qa-MiniLM-L6-cos-v1' (optimized for QA)
+            device: Device to run inference on; falls back to the
+                    embedding_device setting, then CUDA auto-detection
+            fp16: Run the model in half precision (CUDA only); falls back to
+                  the embedding_fp16 setting
+            precision: 'fp32', 'fp16' or 'int8'; overrides fp16 when given
+                       and falls back to the embedding_precision setting.
+                       int8 applies dynamic quantization for CPU inference.
         """
         self.model_name = model_name
+        self.device = device or settings.embedding_device or (
+            "cuda" if torch.cuda.is_available() else "cpu"
+        )
+        self.fp16 = settings.embedding_fp16 if fp16 is None else fp16
+        self.precision = (
+            precision
+            or settings.embedding_precision
+            or ("fp16" if self.fp16 else "fp32")
+        )
+        if self.precision not in ("fp32", "fp16", "int8"):
+            raise ValueError(f"Unsupported precision: {self.precision}")
         self.model = None
         self.embedding_dimension = None
-        self._load_model()
+        self.cache = EmbeddingCache()
+        self.query_cache = SemanticQueryCache()
+        self._model_lock = threading.Lock()
+        self._mp_pool = None
+
+    def _ensure_model(self):
+        """Load the model on first use so app startup stays cheap."""
+        # embedding_dimension is assigned last in _load_model, so it doubles
+        # as the fully-initialized flag for the double-checked lock
+        if self.embedding_dimension is None:
+            with self._model_lock:
+                if self.embedding_dimension is None:
+                    self._load_model()
 
     def _load_model(self):
         """Load the sentence transformer model."""
         try:
-            logger.info(f"Loading embedding model: {self.model_name}")
-            self.model = SentenceTransformer(self.model_name)
-            
-            # Get embedding dimension
-            test_embedding = self.model.encode(["test"])
-            self.embedding_dimension = len(test_embedding[0])
-            
+            logger.info(
+                f"Loading embedding model: {self.model_name} on {self.device} "
+                f"({self.precision})"
+            )
+            if self.device == "cpu":
+                # Default PyTorch grabs every core, which oversubscribes the
+                # host once FastAPI workers and the ingestion pool are also
+                # running; honor OMP_NUM_THREADS, else take half the cores
+                torch.set_num_threads(
+                    int(os.environ.get("OMP_NUM_THREADS",
+                                       max(1, (os.cpu_count() or 2) // 2)))
+                )
+
+            self.model = SentenceTransformer(self.model_name, device=self.device)
+
+            if self.device == "cpu" and os.environ.get("EMBEDDING_USE_IPEX") == "1":
+                # Optional: intel-extension-for-pytorch fuses MHA and
+                # LayerNorm+Linear+Add patterns on supported CPUs
+                try:
+                    import intel_extension_for_pytorch as ipex
+                    self.model[0].auto_model = ipex.optimize(
+                        self.model[0].auto_model, dtype=torch.bfloat16
+                    )
+                    logger.info("Applied IPEX operator fusion (bfloat16)")
+                except ImportError:
+                    logger.warning(
+                        "EMBEDDING_USE_IPEX=1 but intel_extension_for_pytorch "
+                        "is not installed; continuing without it"
+                    )
+
+            if self.precision == "fp16" and self.device.startswith("cuda"):
+                self.model.half()
+            elif self.precision == "int8":
+                # Dynamic quantization rewrites Linear layers to int8 kernels;
+                # on CPU the model is memory-bandwidth bound, so quartering
+                # the weight bytes roughly halves latency (VNNI hosts)
+                self.model = torch.quantization.quantize_dynamic(
+                    self.model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+
+            # One model process per configured device; workers share encode
+            # traffic, so N uvicorn workers need not hold N model copies
+            if settings.embedding_pool_devices:
+                self._mp_pool = self.model.start_multi_process_pool(
+                    list(settings.embedding_pool_devices)
+                )
+                logger.info(
+                    f"Started encode pool on {settings.embedding_pool_devices}"
+                )
+
+            # Statically available; no need to burn a forward pass on it
+            self.embedding_dimension = self.model.get_sentence_embedding_dimension()
+
             logger.info(f"Model loaded successfully. Embedding dimension: {self.embedding_dimension}")
             
         except Exception as e:
             logger.error(f"Error loading embedding model: {str(e)}")
             raise
 
-    def encode_texts(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
+    def encode_texts(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
         """
         Encode a list of texts into embeddings.
-        
+
         Args:
             texts: List of text strings to encode
             batch_size: Batch size for processing (helps with memory management)
-            
+
         Returns:
-            List of embeddings (each embedding is a list of floats)
+            float32 array of shape (len(texts), embedding_dimension); convert
+            with .tolist() only at a JSON boundary if needed
         """
         try:
+            self._ensure_model()
             if not texts:
-                return []
+                return np.empty((0, self.embedding_dimension), dtype=np.float32)
 
-            logger.info(f"Encoding {len(texts)} texts with batch size {batch_size}")
-            
-            # Process in batches to manage memory
-            all_embeddings = []
-            for i in range(0, len(texts), batch_size):
-                batch_texts = texts[i:i + batch_size]
-                batch_embeddings = self.model.encode(
-                    batch_texts,
-                    convert_to_numpy=True,
-                    show_progress_bar=False
-                )
-                
-                # Convert numpy arrays to lists for JSON serialization
-                batch_embeddings_list = [embedding.tolist() for embedding in batch_embeddings]
-                all_embeddings.extend(batch_embeddings_list)
+            # Collapse exact duplicates first: headers, footers and page
+            # numbers repeat across pages, and each repeat would otherwise
+            # cost a cache lookup (and, on a miss, a forward pass) apiece
+            uniq = {}
+            indices = []
+            for text in texts:
+                indices.append(uniq.setdefault(text, len(uniq)))
+            unique_texts = list(uniq)
+
+            # Consult the cache on the unique set only, so hits and writes
+            # are O(unique) rather than O(total)
+            uniq_out = np.empty(
+                (len(unique_texts), self.embedding_dimension), dtype=np.float32
+            )
+            missing_indices = []
+            missing_texts = []
+            for i, text in enumerate(unique_texts):
+                cached = self.cache.get(text)
+                if cached is not None:
+                    uniq_out[i] = cached
+                else:
+                    missing_indices.append(i)
+                    missing_texts.append(text)
+
+            logger.info(
+                f"Encoding {len(missing_texts)} of {len(texts)} texts "
+                f"({len(texts) - len(unique_texts)} duplicates, "
+                f"{len(unique_texts) - len(missing_texts)} cache hits) "
+                f"with batch size {batch_size}"
+            )
+
+            if missing_texts:
+                # Hand the whole list to sentence-transformers in one call: it
+                # sorts by length internally (so batches pad to similar
+                # sequence lengths), batches on-device, and restores the
+                # original order
+                if self._mp_pool is not None:
+                    embeddings = self.model.encode_multi_process(
+                        missing_texts,
+                        self._mp_pool,
+                        batch_size=batch_size,
+                        normalize_embeddings=True
+                    )
+                else:
+                    with torch.inference_mode():
+                        embeddings = self.model.encode(
+                            missing_texts,
+                            batch_size=batch_size,
+                            convert_to_numpy=True,
+                            normalize_embeddings=True,
+                            show_progress_bar=False
+                        )
+                embeddings = embeddings.astype(np.float32, copy=False)
+                uniq_out[missing_indices] = embeddings
+                for text, embedding in zip(missing_texts, embeddings):
+                    self.cache.put(text, embedding)
 
-            logger.info(f"Successfully encoded {len(all_embeddings)} embeddings")
-            return all_embeddings
+            # Scatter unique rows back to the original positions
+            out = uniq_out[np.asarray(indices)]
+
+            logger.info(f"Successfully encoded {len(out)} embeddings")
+            return out
 
         except Exception as e:
             logger.error(f"Error encoding texts: {str(e)}")
@@ -93,27 +229,66 @@ class EmbeddingService:
                 raise ValueError("Empty query provided")
 
             logger.debug(f"Encoding query: {query[:100]}...")
-            
-            embedding = self.model.encode([query], convert_to_numpy=True)[0]
+
+            # Exact repeats skip even the encode via the hash pre-filter
+            normalized = " ".join(query.split()).lower()
+            cached = self.query_cache.get_exact(normalized)
+            if cached is not None:
+                return cached.tolist()
+
+            embedding = self.encode_texts([query])[0]
+
+            # Near-duplicate queries ("what is X" / "tell me about X") map to
+            # almost identical vectors; returning the stored canonical row
+            # lets downstream result caches hit on rephrasings too
+            canonical = self.query_cache.get_similar(embedding)
+            if canonical is not None:
+                return canonical.tolist()
+
+            self.query_cache.add(normalized, embedding)
             return embedding.tolist()
 
         except Exception as e:
             logger.error(f"Error encoding query: {str(e)}")
             raise
 
-    def encode_documents(self, documents: List[Document]) -> List[List[float]]:
+    def encode_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Encode several query strings in a single model forward pass.
+
+        Args:
+            queries: Query strings to encode
+
+        Returns:
+            float32 array of embeddings corresponding to the queries
+        """
+        try:
+            self._ensure_model()
+            if not queries:
+                return np.empty((0, self.embedding_dimension), dtype=np.float32)
+            if any(not query.strip() for query in queries):
+                raise ValueError("Empty query provided")
+
+            return self.encode_texts(queries)
+
+        except Exception as e:
+            logger.error(f"Error encoding queries: {str(e)}")
+            raise
+
+    def encode_documents(self, documents: List[Document]) -> np.ndarray:
         """
         Encode a list of LangChain Document objects.
         
         Args:
             documents: List of LangChain Document objects
-            
+
         Returns:
-            List of embeddings corresponding to the documents
+            float32 array of embeddings corresponding to the documents
         """
         try:
+            self._ensure_model()
             if not documents:
-                return []
+                return np.empty((0, self.embedding_dimension), dtype=np.float32)
 
             # Extract text content from documents
             texts = [doc.page_content for doc in documents]
@@ -124,33 +299,165 @@ class EmbeddingService:
             logger.error(f"Error encoding documents: {str(e)}")
             raise
 
-    def compute_similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
+    # Wire format: 1-byte dtype code + two uint32 shape fields, then the
+    # packed row-major payload. A 384-dim embedding is ~8 KB as a JSON float
+    # list but 768 bytes as fp16 and 384 bytes as int8.
+    _WIRE_HEADER = "<BII"
+    _WIRE_DTYPES = {0: np.float16, 1: np.int8}
+
+    @staticmethod
+    def quantize_int8(embeddings: np.ndarray) -> np.ndarray:
+        """
+        Quantize L2-normalized embeddings to int8.
+
+        Components of a unit vector lie in [-1, 1], so a fixed 127 scale
+        keeps dot-product similarity correct up to int8 precision.
+        """
+        return np.clip(np.round(embeddings * 127), -128, 127).astype(np.int8)
+
+    def encode_texts_bytes(
+        self, texts: List[str], batch_size: int = 32, dtype: str = "float16"
+    ) -> bytes:
+        """
+        Encode texts and pack the embeddings into a compact binary buffer.
+
+        Args:
+            texts: List of text strings to encode
+            batch_size: Batch size for processing
+            dtype: On-wire precision, 'float16' or 'int8'
+
+        Returns:
+            Header plus packed rows; decode with embeddings_from_bytes
+        """
+        embeddings = self.encode_texts(texts, batch_size)
+        if dtype == "float16":
+            code, payload = 0, embeddings.astype(np.float16)
+        elif dtype == "int8":
+            code, payload = 1, self.quantize_int8(embeddings)
+        else:
+            raise ValueError(f"Unsupported wire dtype: {dtype}")
+
+        header = struct.pack(self._WIRE_HEADER, code, *embeddings.shape)
+        return header + payload.tobytes()
+
+    @classmethod
+    def embeddings_from_bytes(cls, buf: bytes) -> np.ndarray:
+        """Decode an encode_texts_bytes buffer back into a float32 array."""
+        code, n, dim = struct.unpack_from(cls._WIRE_HEADER, buf)
+        wire_dtype = cls._WIRE_DTYPES.get(code)
+        if wire_dtype is None:
+            raise ValueError(f"Unknown wire dtype code: {code}")
+
+        offset = struct.calcsize(cls._WIRE_HEADER)
+        arr = np.frombuffer(buf, dtype=wire_dtype, offset=offset).reshape(n, dim)
+        if wire_dtype is np.int8:
+            return arr.astype(np.float32) / 127.0
+        return arr.astype(np.float32)
+
+    def compute_similarity(
+        self,
+        embedding1: List[float],
+        embedding2: List[float],
+        assume_normalized: bool = True
+    ) -> float:
         """
         Compute cosine similarity between two embeddings.
-        
+
+        Every encode_* method in this service produces L2-normalized vectors
+        (normalize_embeddings=True), so by default the similarity is a raw
+        dot product, skipping two norm reductions per call. Pass
+        assume_normalized=False for embeddings from other sources.
+
         Args:
             embedding1: First embedding
             embedding2: Second embedding
-            
+            assume_normalized: Treat inputs as unit vectors (the invariant
+                               for embeddings produced by this service)
+
         Returns:
             Cosine similarity score between -1 and 1
         """
         try:
-            # Convert to numpy arrays
-            vec1 = np.array(embedding1)
-            vec2 = np.array(embedding2)
-            
-            # Compute cosine similarity
-            similarity = np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
-            
-            return float(similarity)
+            vec1 = np.asarray(embedding1, dtype=np.float32)
+            vec2 = np.asarray(embedding2, dtype=np.float32)
+
+            if assume_normalized:
+                return float(np.dot(vec1, vec2))
+
+            # einsum computes the squared norms without the intermediate
+            # arrays that np.linalg.norm allocates
+            norm1 = np.sqrt(np.einsum('i,i->', vec1, vec1))
+            norm2 = np.sqrt(np.einsum('i,i->', vec2, vec2))
+
+            return float(np.dot(vec1, vec2) / (norm1 * norm2))
 
         except Exception as e:
             logger.error(f"Error computing similarity: {str(e)}")
             raise
 
+    def similarities(self, query: List[float], matrix: np.ndarray) -> np.ndarray:
+        """
+        Compute cosine similarity between one query and many embeddings.
+
+        A single matrix-vector product replaces N scalar compute_similarity
+        calls, letting BLAS do the whole comparison in one pass.
+
+        Args:
+            query: Query embedding
+            matrix: Array of shape (N, embedding_dimension); rows are assumed
+                    L2-normalized, as produced by encode_texts
+
+        Returns:
+            float32 array of N cosine similarity scores
+        """
+        try:
+            vec = np.asarray(query, dtype=np.float32)
+            vec = vec / np.sqrt(np.einsum('i,i->', vec, vec))
+
+            matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+            return matrix @ vec
+
+        except Exception as e:
+            logger.error(f"Error computing similarities: {str(e)}")
+            raise
+
+    def top_k_similar(self, query: List[float], matrix: np.ndarray, k: int) -> List[tuple]:
+        """
+        Return the indices and scores of the k most similar embeddings.
+
+        Uses argpartition for an O(N) selection instead of a full sort.
+
+        Args:
+            query: Query embedding
+            matrix: Array of shape (N, embedding_dimension) of normalized rows
+            k: Number of results to return
+
+        Returns:
+            List of (index, similarity) pairs ordered by descending similarity
+        """
+        try:
+            sims = self.similarities(query, matrix)
+            k = min(k, len(sims))
+            if k <= 0:
+                return []
+
+            top = np.argpartition(-sims, k - 1)[:k]
+            top = top[np.argsort(-sims[top])]
+            return [(int(i), float(sims[i])) for i in top]
+
+        except Exception as e:
+            logger.error(f"Error computing top-k similarities: {str(e)}")
+            raise
+
+    def stop_multi_process_pool(self):
+        """Tear down the encode pool, if one was started."""
+        if self._mp_pool is not None:
+            self.model.stop_multi_process_pool(self._mp_pool)
+            self._mp_pool = None
+
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about the loaded model."""
+        self._ensure_model()
         return {
             "model_name": self.model_name,
             "embedding_dimension": self.embedding_dimension,
@@ -159,41 +466,365 @@ class EmbeddingService:
 
     def validate_embedding_dimension(self, embedding: List[float]) -> bool:
         """Validate that an embedding has the correct dimension."""
+        self._ensure_model()
         return len(embedding) == self.embedding_dimension
 
 
+class OnnxEmbeddingService(EmbeddingService):
+    """
+    EmbeddingService variant backed by an ONNX Runtime session.
+
+    Exports the sentence-transformers model through optimum and runs it with
+    onnxruntime, which fuses kernels that stock PyTorch runs one by one.
+    Requires the optional `optimum[onnxruntime]` extra; construction fails
+    with an informative error when it is not installed.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        device: Optional[str] = None,
+        fp16: Optional[bool] = None,
+        provider: str = "CPUExecutionProvider",
+        quantize_int8: bool = False
+    ):
+        self.provider = provider
+        self.quantize_int8 = quantize_int8
+        super().__init__(model_name=model_name, device=device, fp16=fp16)
+
+    def _load_model(self):
+        """Export the model to ONNX and load an onnxruntime session."""
+        try:
+            from optimum.onnxruntime import ORTModelForFeatureExtraction
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise ImportError(
+                "OnnxEmbeddingService requires the optional 'optimum[onnxruntime]' "
+                "package: pip install optimum[onnxruntime]"
+            ) from e
+
+        try:
+            # sentence-transformers model names resolve on the hub under this prefix
+            hub_name = self.model_name
+            if "/" not in hub_name:
+                hub_name = f"sentence-transformers/{hub_name}"
+
+            logger.info(f"Loading ONNX embedding model: {hub_name} ({self.provider})")
+            if self.quantize_int8:
+                self.model = self._load_quantized(
+                    ORTModelForFeatureExtraction, hub_name
+                )
+            else:
+                self.model = ORTModelForFeatureExtraction.from_pretrained(
+                    hub_name, export=True, provider=self.provider
+                )
+            self.tokenizer = AutoTokenizer.from_pretrained(hub_name)
+            self.embedding_dimension = int(self.model.config.hidden_size)
+
+            logger.info(f"Model loaded successfully. Embedding dimension: {self.embedding_dimension}")
+
+        except Exception as e:
+            logger.error(f"Error loading ONNX embedding model: {str(e)}")
+            raise
+
+    def _load_quantized(self, ort_model_cls, hub_name: str):
+        """Export, dynamically quantize to int8 and load, caching on disk.
+
+        int8 GEMM roughly halves memory bandwidth and runs on VNNI units,
+        giving 2-4x faster CPU query encoding with negligible quality loss.
+        """
+        from optimum.onnxruntime import ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+        save_dir = os.path.join(
+            os.path.expanduser("~/.cache/pdfmodel"),
+            f"{self.model_name.replace('/', '--')}-int8"
+        )
+        if not os.path.isdir(save_dir):
+            logger.info(f"Quantizing {hub_name} to int8 (one-time export)")
+            exported = ort_model_cls.from_pretrained(hub_name, export=True)
+            quantizer = ORTQuantizer.from_pretrained(exported)
+            quantizer.quantize(
+                save_dir=save_dir,
+                quantization_config=AutoQuantizationConfig.avx512_vnni(
+                    is_static=False
+                )
+            )
+        return ort_model_cls.from_pretrained(save_dir, provider=self.provider)
+
+    def encode_texts(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Encode a list of texts with the ONNX session.
+
+        Tokenizes each batch, mean-pools the token embeddings under the
+        attention mask and L2-normalizes, matching the pooling of the
+        PyTorch sentence-transformers pipeline.
+        """
+        try:
+            self._ensure_model()
+            if not texts:
+                return np.empty((0, self.embedding_dimension), dtype=np.float32)
+
+            logger.info(f"Encoding {len(texts)} texts with batch size {batch_size}")
+
+            out = np.empty((len(texts), self.embedding_dimension), dtype=np.float32)
+            for i in range(0, len(texts), batch_size):
+                batch_texts = texts[i:i + batch_size]
+                encoded = self.tokenizer(
+                    batch_texts,
+                    padding=True,
+                    truncation=True,
+                    return_tensors="pt"
+                )
+                token_embeddings = self.model(**encoded).last_hidden_state.numpy()
+
+                # Mean-pool over real tokens only, then L2-normalize
+                mask = encoded["attention_mask"].numpy()[:, :, np.newaxis].astype(np.float32)
+                summed = (token_embeddings * mask).sum(axis=1)
+                counts = np.clip(mask.sum(axis=1), 1e-9, None)
+                pooled = summed / counts
+                pooled /= np.linalg.norm(pooled, axis=1, keepdims=True)
+                out[i:i + batch_size] = pooled.astype(np.float32, copy=False)
+
+            logger.info(f"Successfully encoded {len(out)} embeddings")
+            return out
+
+        except Exception as e:
+            logger.error(f"Error encoding texts: {str(e)}")
+            raise
+
+    def get_model_info(self) -> Dict[str, Any]:
+        """Get information about the loaded model."""
+        self._ensure_model()
+        return {
+            "model_name": self.model_name,
+            "embedding_dimension": self.embedding_dimension,
+            "max_sequence_length": getattr(self.tokenizer, 'model_max_length', None),
+            "runtime": "onnxruntime",
+            "provider": self.provider
+        }
+
+
+def create_embedding_service(
+    model_name: str = "all-MiniLM-L6-v2", **kwargs
+) -> EmbeddingService:
+    """Build an embedding service for the configured backend.
+
+    Selected by the embedding_backend setting: 'torch' (default), 'onnx', or
+    'onnx-int8' for the dynamically quantized CPU path. Both callers and the
+    encode_*/compute_similarity API stay backend-agnostic.
+    """
+    backend = settings.embedding_backend
+    if backend == "onnx":
+        return OnnxEmbeddingService(model_name, **kwargs)
+    if backend == "onnx-int8":
+        return OnnxEmbeddingService(model_name, quantize_int8=True, **kwargs)
+    if backend != "torch":
+        raise ValueError(f"Unsupported embedding backend: {backend}")
+    return EmbeddingService(model_name, **kwargs)
+
+
+class BatchingEncoder:
+    """
+    Coalesces concurrent query encodes into shared forward passes.
+
+    Encoder throughput is bound by padded token count, not by how many
+    callers issued requests, so under concurrent load it is much cheaper to
+    encode ten questions in one batch than in ten dispatches. Callers await
+    encode_query_batched; a background task drains the queue, waits up to
+    max_wait_ms for stragglers, runs one encode_queries call (which
+    length-sorts internally) and resolves each caller's future.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        max_batch: int = 64,
+        max_wait_ms: float = 10.0
+    ):
+        self.embedding_service = embedding_service
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = asyncio.Queue()
+        self._worker = None
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._drain())
+
+    async def encode_query_batched(self, question: str) -> List[float]:
+        """Encode one query, sharing the forward pass with concurrent callers."""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((question, future))
+        return await future
+
+    async def _drain(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            question, future = await self._queue.get()
+            batch = [(question, future)]
+
+            # Hold the batch open briefly for stragglers; 10 ms of added
+            # latency buys a much larger effective batch under load
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self._queue.get(), timeout)
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+            texts = [q for q, _ in batch]
+            try:
+                embeddings = await asyncio.to_thread(
+                    self.embedding_service.encode_queries, texts
+                )
+                for (_, fut), embedding in zip(batch, embeddings):
+                    if not fut.done():
+                        fut.set_result(embedding.tolist())
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+
+
+class SemanticQueryCache:
+    """
+    Ring buffer of recent query embeddings with similarity-based hits.
+
+    Rows are stored as fp16 in a fixed (max_size, dim) buffer; a lookup is
+    one BLAS matrix-vector product over the filled rows. An exact-match map
+    from normalized query digests to rows lets verbatim repeats skip the
+    encoder entirely, while get_similar catches rephrasings whose cosine
+    similarity to a stored query exceeds the threshold.
+    """
+
+    def __init__(self, max_size: int = 1024, threshold: float = 0.97):
+        self.max_size = max_size
+        self.threshold = threshold
+        self._rows = None  # allocated on first add, once the dimension is known
+        self._count = 0
+        self._next = 0
+        self._exact = {}  # digest -> row index
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode(), digest_size=8).digest()
+
+    def get_exact(self, text: str) -> Optional[np.ndarray]:
+        """Return the stored embedding for a verbatim-repeated query."""
+        key = self._key(text)
+        with self._lock:
+            row = self._exact.get(key)
+            if row is not None:
+                return self._rows[row].astype(np.float32)
+        return None
+
+    def get_similar(self, embedding: np.ndarray) -> Optional[np.ndarray]:
+        """Return the closest stored embedding if it clears the threshold."""
+        with self._lock:
+            if self._count == 0:
+                return None
+            filled = self._rows[:self._count].astype(np.float32)
+            sims = filled @ embedding
+            best = int(np.argmax(sims))
+            if sims[best] >= self.threshold:
+                return filled[best]
+        return None
+
+    def add(self, text: str, embedding: np.ndarray):
+        """Store a query embedding, overwriting the oldest slot when full."""
+        key = self._key(text)
+        with self._lock:
+            if self._rows is None:
+                self._rows = np.empty(
+                    (self.max_size, embedding.shape[-1]), dtype=np.float16
+                )
+            row = self._next
+            # Drop the exact-map entry whose slot is being recycled
+            for old_key, old_row in list(self._exact.items()):
+                if old_row == row:
+                    del self._exact[old_key]
+            self._rows[row] = embedding
+            self._exact[key] = row
+            self._next = (self._next + 1) % self.max_size
+            self._count = min(self._count + 1, self.max_size)
+
+
 class EmbeddingCache:
-    """Simple in-memory cache for embeddings to avoid recomputation."""
-    
+    """
+    In-memory LRU cache for embeddings to avoid recomputation.
+
+    Embeddings live in one packed float32 array of shape
+    (max_size, embedding_dimension) instead of per-key Python lists:
+    a 384-dim entry is 1.5 KB packed vs ~11 KB as boxed floats, so the
+    same RAM holds a much larger cache. The OrderedDict maps digest key
+    to a row in the slab and provides O(1) LRU ordering.
+    """
+
     def __init__(self, max_size: int = 1000):
-        self.cache = {}
+        self.cache = OrderedDict()  # key -> slab row index
         self.max_size = max_size
-        self.access_order = []
-
-    def get(self, text: str) -> List[float]:
-        """Get embedding from cache."""
-        if text in self.cache:
-            # Update access order
-            self.access_order.remove(text)
-            self.access_order.append(text)
-            return self.cache[text]
+        self._slab = None  # allocated on first put, once the dimension is known
+        self._next_row = 0
+        # FastAPI workers can encode concurrently, so guard every access
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        """8-byte digest key so the cache does not retain full chunk strings."""
+        return hashlib.blake2b(text.encode(), digest_size=8).digest()
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Get a copy of the cached embedding, or None on a miss."""
+        key = self._key(text)
+        with self._lock:
+            row = self.cache.get(key)
+            if row is not None:
+                self.cache.move_to_end(key)
+                # Copy while still holding the lock: a view into the slab
+                # could be overwritten by a concurrent put that evicts this
+                # entry and reuses its row before the caller reads it
+                return self._slab[row].copy()
         return None
 
-    def put(self, text: str, embedding: List[float]):
-        """Store embedding in cache."""
-        if len(self.cache) >= self.max_size:
-            # Remove least recently used
-            oldest = self.access_order.pop(0)
-            del self.cache[oldest]
+    def put(self, text: str, embedding: np.ndarray):
+        """Store embedding in cache, evicting the least recently used entry."""
+        embedding = np.asarray(embedding, dtype=np.float32)
+        key = self._key(text)
+        with self._lock:
+            if self._slab is None:
+                self._slab = np.empty(
+                    (self.max_size, embedding.shape[-1]), dtype=np.float32
+                )
+
+            row = self.cache.get(key)
+            if row is not None:
+                self.cache.move_to_end(key)
+            elif len(self.cache) >= self.max_size:
+                # Reuse the evicted entry's row for the new one
+                _, row = self.cache.popitem(last=False)
+                self.cache[key] = row
+            else:
+                row = self._next_row
+                self._next_row += 1
+                self.cache[key] = row
 
-        self.cache[text] = embedding
-        self.access_order.append(text)
+            self._slab[row] = embedding
 
     def clear(self):
         """Clear the cache."""
-        self.cache.clear()
-        self.access_order.clear()
+        with self._lock:
+            self.cache.clear()
+            self._next_row = 0
 
     def size(self) -> int:
         """Get current cache size."""
-        return len(self.cache)
\ No newline at end of file
+        with self._lock:
+            return len(self.cache)
\ No newline at end of file
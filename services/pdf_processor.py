@@ -1,28 +1,114 @@
+import asyncio
+import bisect
 import os
+import re
 import uuid
-from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import AsyncIterator, Dict, Any, Iterator, List
 import PyPDF2
 import pdfplumber
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+try:
+    import fitz  # pymupdf: C-backed, typically 5-20x faster than pure-Python readers
+except ImportError:
+    fitz = None
+
 from langchain.schema import Document
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Per-worker-process cache of the currently open PDF, so a worker handling
+# many pages of the same file parses the document structure only once
+_worker_pdf = {}
+
+
+def _extract_page(file_path: str, page_idx: int) -> str:
+    """Extract one page's text; module-level so it is picklable for workers."""
+    pdf = _worker_pdf.get(file_path)
+    if pdf is None:
+        for open_pdf in _worker_pdf.values():
+            open_pdf.close()
+        _worker_pdf.clear()
+        pdf = pdfplumber.open(file_path)
+        _worker_pdf[file_path] = pdf
+    return pdf.pages[page_idx].extract_text() or ""
+
+
+@lru_cache(maxsize=32)
+def _pdf_info(file_path: str, mtime: float) -> Dict[str, Any]:
+    """
+    Parse a PDF's structure once per (path, mtime) and return its basic info.
+
+    validate_pdf, get_pdf_info and process_pdf all need the page count or
+    metadata of the same file in one request path; keying on the mtime keeps
+    the memoization correct if a file is overwritten.
+    """
+    if fitz is not None:
+        with fitz.open(file_path) as doc:
+            return {
+                "page_count": doc.page_count,
+                "file_size": os.path.getsize(file_path),
+                "metadata": doc.metadata or {}
+            }
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return {
+            "page_count": len(pdf_reader.pages),
+            "file_size": os.path.getsize(file_path),
+            "metadata": pdf_reader.metadata if hasattr(pdf_reader, 'metadata') else {}
+        }
+
 
 class PDFProcessor:
+    # One C-level scan finds every candidate split point; ordering in the
+    # alternation makes finditer prefer paragraph over line over word breaks
+    # at the same offset
+    _separator_re = re.compile(r"\n\n|\n| ")
+
     def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            length_function=len,
-            separators=["\n\n", "\n", " ", ""]
-        )
 
-    async def extract_text_pypdf2(self, file_path: str) -> str:
-        """Extract text from PDF using PyPDF2."""
+    def split_text(self, text: str) -> List[str]:
+        """
+        Split text into chunks of at most chunk_size with chunk_overlap.
+
+        LangChain's RecursiveCharacterTextSplitter re-walks the string once
+        per separator in Python; here a single compiled-regex scan collects
+        every separator offset, then chunks are packed greedily with a
+        bisect lookup for the last boundary inside each window — O(N) with
+        the hot loops in C.
+        """
+        n = len(text)
+        if n <= self.chunk_size:
+            return [text] if text else []
+
+        boundaries = [m.end() for m in self._separator_re.finditer(text)]
+
+        chunks = []
+        start = 0
+        while start < n:
+            end = start + self.chunk_size
+            if end >= n:
+                chunks.append(text[start:])
+                break
+
+            # Prefer ending at the last separator inside the window; fall
+            # back to a hard cut when a run has no separators at all
+            i = bisect.bisect_right(boundaries, end) - 1
+            if i >= 0 and boundaries[i] > start:
+                end = boundaries[i]
+            chunks.append(text[start:end])
+
+            next_start = end - self.chunk_overlap
+            start = next_start if next_start > start else end
+
+        return chunks
+
+    def _extract_text_pypdf2_sync(self, file_path: str) -> str:
+        """Blocking body of extract_text_pypdf2; runs in a worker thread."""
         try:
             text = ""
             with open(file_path, 'rb') as file:
@@ -34,23 +120,59 @@ class PDFProcessor:
             logger.error(f"Error extracting text with PyPDF2: {str(e)}")
             raise
 
-    async def extract_text_pdfplumber(self, file_path: str) -> str:
-        """Extract text from PDF using pdfplumber (better for complex layouts)."""
+    async def extract_text_pypdf2(self, file_path: str) -> str:
+        """Extract text from PDF using PyPDF2."""
+        return await asyncio.to_thread(self._extract_text_pypdf2_sync, file_path)
+
+    def _extract_text_pdfplumber_sync(self, file_path: str) -> str:
+        """Blocking body of extract_text_pdfplumber; runs in a worker thread."""
         try:
-            text = ""
             with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            return text.strip()
+                n_pages = len(pdf.pages)
+                # Page extraction is pure Python under the GIL and
+                # embarrassingly parallel, but a process pool only pays off
+                # once there are enough pages to amortize worker startup
+                if n_pages < 4 or (os.cpu_count() or 1) < 2:
+                    pages = [page.extract_text() or "" for page in pdf.pages]
+                    return "\n".join(p for p in pages if p).strip()
+
+            workers = min(n_pages, os.cpu_count())
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pages = list(executor.map(
+                    _extract_page, [file_path] * n_pages, range(n_pages)
+                ))
+            return "\n".join(p for p in pages if p).strip()
         except Exception as e:
             logger.error(f"Error extracting text with pdfplumber: {str(e)}")
             raise
 
-    async def extract_text(self, file_path: str, method: str = "pdfplumber") -> str:
+    async def extract_text_pdfplumber(self, file_path: str) -> str:
+        """Extract text from PDF using pdfplumber (better for complex layouts)."""
+        return await asyncio.to_thread(self._extract_text_pdfplumber_sync, file_path)
+
+    def _extract_text_pymupdf_sync(self, file_path: str) -> str:
+        """Blocking body of extract_text_pymupdf; runs in a worker thread."""
+        if fitz is None:
+            raise RuntimeError("pymupdf is not installed")
+        try:
+            with fitz.open(file_path) as doc:
+                return "\n".join(page.get_text("text") for page in doc).strip()
+        except Exception as e:
+            logger.error(f"Error extracting text with pymupdf: {str(e)}")
+            raise
+
+    async def extract_text_pymupdf(self, file_path: str) -> str:
+        """Extract text from PDF using pymupdf (MuPDF; fastest backend)."""
+        return await asyncio.to_thread(self._extract_text_pymupdf_sync, file_path)
+
+    async def extract_text(self, file_path: str, method: str = "pymupdf") -> str:
         """Extract text from PDF using specified method."""
-        if method == "pypdf2":
+        if method == "pymupdf":
+            # Fall back to pdfplumber when pymupdf is not installed
+            if fitz is None:
+                return await self.extract_text_pdfplumber(file_path)
+            return await self.extract_text_pymupdf(file_path)
+        elif method == "pypdf2":
             return await self.extract_text_pypdf2(file_path)
         elif method == "pdfplumber":
             return await self.extract_text_pdfplumber(file_path)
@@ -58,35 +180,130 @@ class PDFProcessor:
             raise ValueError(f"Unsupported extraction method: {method}")
 
     def create_chunks(self, text: str, metadata: Dict[str, Any] = None) -> List[Document]:
-        """Split text into chunks using LangChain text splitter."""
+        """Split text into chunks and wrap them as Documents."""
         if not text.strip():
             raise ValueError("Empty text provided for chunking")
 
         if metadata is None:
             metadata = {}
 
+        # Coerce metadata to ChromaDB-serializable scalars once, at chunk time,
+        # so the vector store does not have to re-check every key per chunk
+        base = {
+            k: v if isinstance(v, (str, int, float, bool)) else str(v)
+            for k, v in metadata.items()
+        }
+
         try:
-            chunks = self.text_splitter.split_text(text)
+            chunks = self.split_text(text)
+            n = len(chunks)
             documents = []
-            
+
             for i, chunk in enumerate(chunks):
-                if chunk.strip():
-                    doc_metadata = {
-                        **metadata,
-                        "chunk_id": i,
-                        "chunk_size": len(chunk),
-                        "total_chunks": len(chunks)
-                    }
+                stripped = chunk.strip()
+                if stripped:
+                    # dict(base, ...) copies base once per chunk at C level
+                    # without re-evaluating a ** unpacking expression; the
+                    # preview lets search results skip fetching full texts
                     documents.append(Document(
-                        page_content=chunk.strip(),
-                        metadata=doc_metadata
+                        page_content=stripped,
+                        metadata=dict(base, chunk_id=i, chunk_size=len(chunk),
+                                      total_chunks=n, preview=stripped[:400])
                     ))
-            
+
             return documents
         except Exception as e:
             logger.error(f"Error creating chunks: {str(e)}")
             raise
 
+    def iter_pages(self, file_path: str) -> Iterator[str]:
+        """Yield page texts one at a time without materializing the full document."""
+        try:
+            if fitz is not None:
+                with fitz.open(file_path) as doc:
+                    for page in doc:
+                        yield page.get_text("text")
+            else:
+                with pdfplumber.open(file_path) as pdf:
+                    for page in pdf.pages:
+                        yield page.extract_text() or ""
+        except Exception as e:
+            logger.error(f"Error iterating PDF pages: {str(e)}")
+            raise
+
+    async def process_pdf_stream(
+        self, file_path: str, document_id: str, filename: str
+    ) -> AsyncIterator[Document]:
+        """
+        Streaming variant of process_pdf: yields chunk Documents as pages are
+        extracted instead of materializing the whole text first.
+
+        Pages accumulate in a rolling buffer; once the buffer holds several
+        chunks' worth of text it is split, all complete chunks are yielded and
+        the tail is carried over so chunk overlap spans page boundaries. Peak
+        memory stays at a few chunks regardless of document size, and a
+        downstream consumer can start embedding before extraction finishes.
+
+        Note: streamed chunk metadata omits total_chunks/text_length, which
+        are only known once the whole document has been read.
+        """
+        try:
+            metadata = {
+                "document_id": document_id,
+                "filename": filename,
+                "file_path": file_path,
+                "file_size": os.path.getsize(file_path)
+            }
+
+            pages = self.iter_pages(file_path)
+            sentinel = object()
+            buffer = ""
+            chunk_id = 0
+            while True:
+                # Pull each page in a thread so extraction (CPU/C extension
+                # work) does not block the event loop
+                page_text = await asyncio.to_thread(next, pages, sentinel)
+                if page_text is sentinel:
+                    break
+                if page_text:
+                    buffer += page_text + "\n"
+
+                if len(buffer) >= self.chunk_size * 4:
+                    chunks = self.split_text(buffer)
+                    # Keep the last piece in the buffer: re-splitting it with
+                    # the next pages preserves overlap across the boundary
+                    for chunk in chunks[:-1]:
+                        stripped = chunk.strip()
+                        if stripped:
+                            yield Document(
+                                page_content=stripped,
+                                metadata=dict(metadata, chunk_id=chunk_id,
+                                              chunk_size=len(chunk),
+                                              preview=stripped[:400])
+                            )
+                            chunk_id += 1
+                    buffer = chunks[-1] if chunks else ""
+
+            for chunk in self.split_text(buffer):
+                stripped = chunk.strip()
+                if stripped:
+                    yield Document(
+                        page_content=stripped,
+                        metadata=dict(metadata, chunk_id=chunk_id,
+                                      chunk_size=len(chunk),
+                                      preview=stripped[:400])
+                    )
+                    chunk_id += 1
+
+            if chunk_id == 0:
+                raise ValueError("No text could be extracted from PDF")
+
+            logger.info(f"Successfully streamed {filename}: {chunk_id} chunks created")
+
+        except Exception as e:
+            logger.error(f"Error streaming PDF {filename}: {str(e)}")
+            raise
+
     async def process_pdf(self, file_path: str, document_id: str, filename: str) -> List[Document]:
         """Complete PDF processing pipeline."""
         try:
@@ -123,23 +340,15 @@ class PDFProcessor:
     def validate_pdf(self, file_path: str) -> bool:
         """Validate if file is a proper PDF."""
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                return len(pdf_reader.pages) > 0
+            return _pdf_info(file_path, os.path.getmtime(file_path))["page_count"] > 0
         except Exception:
             return False
 
     def get_pdf_info(self, file_path: str) -> Dict[str, Any]:
         """Get basic information about the PDF."""
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                info = {
-                    "page_count": len(pdf_reader.pages),
-                    "file_size": os.path.getsize(file_path),
-                    "metadata": pdf_reader.metadata if hasattr(pdf_reader, 'metadata') else {}
-                }
-                return info
+            # Copy so callers cannot mutate the memoized dict
+            return dict(_pdf_info(file_path, os.path.getmtime(file_path)))
         except Exception as e:
             logger.error(f"Error getting PDF info: {str(e)}")
             return {"page_count": 0, "file_size": 0, "metadata": {}}
\ No newline at end of file
@@ -1,17 +1,98 @@
+import asyncio
+import hashlib
+import heapq
 import os
-import json
+import re
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import logging
 
-from .embedding_service import EmbeddingService
+import numpy as np
+
+from .embedding_service import BatchingEncoder, create_embedding_service
 from .pdf_processor import PDFProcessor
+from database.metadata_store import MetadataStore
 from database.vector_store import VectorStore
 
 logger = logging.getLogger(__name__)
 
+# Precompiled patterns for the _extract_* helpers; compiling per call made
+# every answer pay regex construction on top of the scan itself
+_SPACED_NAME_START_RE = re.compile(r'^[A-Z]\s+[A-Z]\s+[A-Z]')
+_SPACED_NAME_RE = re.compile(r'^([A-Z]\s+)+[A-Z]')
+_EMAIL_PREFIX_RE = re.compile(r'\b([a-zA-Z0-9._%+-]+)@[a-zA-Z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_PHONE_RE = re.compile(r'\b(?:\+?1[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})\b')
+_YEAR_RE = re.compile(r'\b(19|20)\d{2}\b')
+_NAME_RE = re.compile(r'\b[A-Z][a-z]{2,}\s+[A-Z][a-z]{2,}\b')
+
+# Keyword sets scanned as one alternation each: a single linear regex pass
+# replaces K independent substring scans over the same content
+_JOB_KEYWORDS = ['developer', 'engineer', 'manager', 'analyst', 'consultant',
+                 'specialist', 'coordinator', 'director', 'lead', 'senior']
+_TECH_KEYWORDS = ['python', 'java', 'javascript', 'react', 'node', 'sql', 'aws',
+                  'docker', 'kubernetes', 'git', 'linux', 'mongodb', 'postgresql',
+                  'html', 'css', 'angular', 'vue', 'django', 'flask', 'spring']
+_EDU_KEYWORDS = ['university', 'college', 'degree', 'bachelor', 'master', 'phd',
+                 'graduation', 'graduated', 'school', 'education']
+
+
+def _keyword_regex(keywords: List[str]) -> "re.Pattern":
+    # Longest alternatives first, otherwise an earlier short keyword
+    # shadows any longer one it prefixes ('java' would make 'javascript'
+    # unreachable)
+    return re.compile("|".join(sorted(keywords, key=len, reverse=True)))
+
+
+def _nested_keywords(keywords: List[str]) -> Dict[str, List[str]]:
+    """Map each keyword to the shorter keywords it contains."""
+    nested = {}
+    for kw in keywords:
+        inside = [other for other in keywords if other != kw and other in kw]
+        if inside:
+            nested[kw] = inside
+    return nested
+
+
+def _find_keywords(regex: "re.Pattern", nested: Dict[str, List[str]],
+                   text: str) -> List[str]:
+    """One-pass keyword scan preserving the old substring reporting.
+
+    The regex yields the longest keyword at each position; nested ones are
+    re-added afterwards ('javascript' implies 'java', 'postgresql' implies
+    'sql'), so the result matches what per-keyword substring checks would
+    have found. Returns unique keywords in match order.
+    """
+    found = dict.fromkeys(regex.findall(text))
+    for kw in list(found):
+        for sub in nested.get(kw, ()):
+            found.setdefault(sub)
+    return list(found)
+
+
+_JOB_RE = _keyword_regex(_JOB_KEYWORDS)
+_TECH_RE = _keyword_regex(_TECH_KEYWORDS)
+_EDU_RE = _keyword_regex(_EDU_KEYWORDS)
+_JOB_NESTED = _nested_keywords(_JOB_KEYWORDS)
+_TECH_NESTED = _nested_keywords(_TECH_KEYWORDS)
+
 
 class RAGService:
+    # Question-type dispatch stems, matched as token prefixes: the question
+    # is tokenized once and each token checked with one startswith per
+    # category, so inflected forms ("worked", "universities") still dispatch
+    # the way the old substring checks did
+    _NAME_STEMS = ("name", "who")
+    _EXP_STEMS = ("experience", "work", "job", "position")
+    _SKILL_STEMS = ("skill", "technolog", "technical")
+    _EDU_STEMS = ("education", "degree", "universit", "college")
+    _CONTACT_STEMS = ("contact", "email", "phone", "address")
+
+    @staticmethod
+    def _has_stem(words, stems) -> bool:
+        return any(word.startswith(stems) for word in words)
+
     def __init__(
         self,
         embedding_model: str = "all-MiniLM-L6-v2",
@@ -28,44 +109,106 @@ class RAGService:
             chunk_overlap: Overlap between chunks
             vector_store_path: Path to store vector database
         """
-        self.embedding_service = EmbeddingService(embedding_model)
+        self.embedding_service = create_embedding_service(embedding_model)
+        self.batching_encoder = BatchingEncoder(self.embedding_service)
         self.pdf_processor = PDFProcessor(chunk_size, chunk_overlap)
         self.vector_store = VectorStore(vector_store_path)
         
-        # Document metadata storage with file persistence
-        self.metadata_file = "./documents_metadata.json"
-        self.documents_metadata = self._load_metadata()
+        # Document metadata storage: one SQLite row per document, so a
+        # single-document change no longer rewrites the whole corpus'
+        # metadata (the store migrates any legacy JSON file on first run)
+        self.metadata_store = MetadataStore()
+
+        # Query embedding cache keyed by whitespace/case-normalized question;
+        # persisted across restarts so warm queries never pay the encoder
+        self.query_cache_file = "./query_embeddings.npz"
+        self._query_cache_max = 10000
+        self._query_cache = self._load_query_cache()
+
+    @staticmethod
+    def _normalize_question(question: str) -> str:
+        return " ".join(question.lower().split())
 
-    def _load_metadata(self) -> Dict[str, Dict[str, Any]]:
-        """Load document metadata from file."""
+    def _load_query_cache(self) -> "OrderedDict[str, np.ndarray]":
+        """Load persisted query embeddings from disk."""
+        cache = OrderedDict()
         try:
-            if os.path.exists(self.metadata_file):
-                with open(self.metadata_file, 'r') as f:
-                    data = json.load(f)
-                    # Convert date strings back to datetime objects
-                    for doc_id, metadata in data.items():
-                        if 'upload_date' in metadata and isinstance(metadata['upload_date'], str):
-                            metadata['upload_date'] = datetime.fromisoformat(metadata['upload_date'])
-                    return data
+            if os.path.exists(self.query_cache_file):
+                data = np.load(self.query_cache_file)
+                for key, embedding in zip(data["keys"], data["embeddings"]):
+                    cache[str(key)] = embedding
+                logger.info(f"Loaded {len(cache)} cached query embeddings")
         except Exception as e:
-            logger.error(f"Error loading metadata: {str(e)}")
-        return {}
+            logger.error(f"Error loading query embedding cache: {str(e)}")
+        return cache
 
-    def _save_metadata(self):
-        """Save document metadata to file."""
+    def save_query_cache(self):
+        """Persist cached query embeddings to disk (called on shutdown)."""
         try:
-            # Convert datetime objects to strings for JSON serialization
-            data_to_save = {}
-            for doc_id, metadata in self.documents_metadata.items():
-                serializable_metadata = metadata.copy()
-                if 'upload_date' in serializable_metadata and isinstance(serializable_metadata['upload_date'], datetime):
-                    serializable_metadata['upload_date'] = serializable_metadata['upload_date'].isoformat()
-                data_to_save[doc_id] = serializable_metadata
-            
-            with open(self.metadata_file, 'w') as f:
-                json.dump(data_to_save, f, indent=2)
+            if self._query_cache:
+                np.savez(
+                    self.query_cache_file,
+                    keys=np.array(list(self._query_cache), dtype=str),
+                    embeddings=np.stack(list(self._query_cache.values()))
+                )
+                logger.info(f"Saved {len(self._query_cache)} query embeddings")
         except Exception as e:
-            logger.error(f"Error saving metadata: {str(e)}")
+            logger.error(f"Error saving query embedding cache: {str(e)}")
+
+    async def _get_question_embedding(self, question: str) -> np.ndarray:
+        """Return the question embedding, cached by normalized text."""
+        key = self._normalize_question(question)
+        cached = self._query_cache.get(key)
+        if cached is not None:
+            self._query_cache.move_to_end(key)
+            return cached
+
+        embedding = np.asarray(
+            await self.batching_encoder.encode_query_batched(question),
+            dtype=np.float32
+        )
+        self._query_cache[key] = embedding
+        if len(self._query_cache) > self._query_cache_max:
+            self._query_cache.popitem(last=False)
+        return embedding
+
+    def _encode_documents_deduped(self, documents) -> np.ndarray:
+        """Encode chunk texts, skipping chunks whose exact bytes were embedded before.
+
+        Template PDFs (resumes, forms, letterheads) repeat boilerplate across
+        uploads; each chunk is keyed by a blake2b content hash against the
+        persistent chunk_hashes table, and only unseen texts go through the
+        model. Newly encoded vectors are stored for future uploads.
+        """
+        texts = [doc.page_content for doc in documents]
+        hashes = [
+            hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+            for text in texts
+        ]
+        cached = self.metadata_store.get_chunk_embeddings(hashes)
+        missing = [i for i, h in enumerate(hashes) if h not in cached]
+
+        if missing:
+            new = self.embedding_service.encode_texts([texts[i] for i in missing])
+            dim = new.shape[1]
+        else:
+            dim = len(next(iter(cached.values())))
+
+        out = np.empty((len(texts), dim), dtype=np.float32)
+        for i, content_hash in enumerate(hashes):
+            vector = cached.get(content_hash)
+            if vector is not None:
+                out[i] = vector
+        if missing:
+            out[missing] = new
+            self.metadata_store.put_chunk_embeddings(
+                {hashes[i]: new[j] for j, i in enumerate(missing)}
+            )
+            logger.info(
+                f"Encoded {len(missing)} of {len(texts)} chunks "
+                f"({len(texts) - len(missing)} reused from chunk-hash cache)"
+            )
+        return out
 
     async def process_and_store_pdf(
         self, 
@@ -100,16 +243,24 @@ class RAGService:
             if not documents:
                 raise ValueError("No text could be extracted from PDF")
 
-            # Generate embeddings for all chunks
+            # Generate embeddings for all chunks, reusing stored vectors for
+            # byte-identical chunks seen in earlier uploads; both the forward
+            # pass and the ChromaDB insert are blocking, so they run in
+            # worker threads to keep the event loop (and /health) responsive
             logger.info(f"Generating embeddings for {len(documents)} chunks")
-            embeddings = self.embedding_service.encode_documents(documents)
+            embeddings = await asyncio.to_thread(
+                self._encode_documents_deduped, documents
+            )
 
             # Store in vector database
-            success = self.vector_store.add_documents(documents, embeddings)
+            success = await asyncio.to_thread(
+                self.vector_store.add_documents, documents, embeddings
+            )
             
             if success:
-                # Store document metadata
-                self.documents_metadata[document_id] = {
+                # Store document metadata; the SQLite write runs in a worker
+                # thread so the fsync never stalls the event loop
+                await asyncio.to_thread(self.metadata_store.upsert, {
                     "document_id": document_id,
                     "filename": filename,
                     "file_path": file_path,
@@ -118,8 +269,7 @@ class RAGService:
                     "file_size": pdf_info.get("file_size", 0),
                     "page_count": pdf_info.get("page_count", 0),
                     "status": "completed"
-                }
-                self._save_metadata()
+                })
 
                 result = {
                     "document_id": document_id,
@@ -137,17 +287,117 @@ class RAGService:
         except Exception as e:
             logger.error(f"Error processing PDF {filename}: {str(e)}")
             # Update metadata with error status
-            self.documents_metadata[document_id] = {
+            await asyncio.to_thread(self.metadata_store.upsert, {
                 "document_id": document_id,
                 "filename": filename,
                 "file_path": file_path,
                 "upload_date": datetime.now(),
                 "status": "failed",
                 "error_message": str(e)
-            }
-            self._save_metadata()
+            })
             raise
 
+    async def process_and_store_many(
+        self,
+        file_specs: List[Tuple[str, str, str]],
+        parse_concurrency: int = 2
+    ) -> List[Dict[str, Any]]:
+        """
+        Ingest several PDFs with parsing overlapped against encoding/storage.
+
+        Parsing is CPU/extension-bound while encoding is model-bound, so the
+        strictly sequential parse->encode->store of process_and_store_pdf
+        leaves one side idle at any time. Here up to parse_concurrency files
+        parse concurrently and feed a bounded queue; a single consumer
+        encodes and stores them, so parsing of the next document overlaps
+        the embedding of the previous one.
+
+        Args:
+            file_specs: (file_path, filename, document_id) tuples
+            parse_concurrency: How many files may parse at once
+
+        Returns:
+            One result dict per file, in input order (failed files carry
+            status 'failed' instead of raising)
+        """
+        semaphore = asyncio.Semaphore(parse_concurrency)
+        queue = asyncio.Queue(maxsize=parse_concurrency)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(file_specs)
+
+        async def parse_one(index, file_path, filename, document_id):
+            async with semaphore:
+                try:
+                    if not self.pdf_processor.validate_pdf(file_path):
+                        raise ValueError("Invalid PDF file")
+                    pdf_info = self.pdf_processor.get_pdf_info(file_path)
+                    documents = await self.pdf_processor.process_pdf(
+                        file_path, document_id, filename
+                    )
+                    if not documents:
+                        raise ValueError("No text could be extracted from PDF")
+                    await queue.put((index, pdf_info, documents, None))
+                except Exception as e:
+                    await queue.put((index, None, None, e))
+
+        parsers = [
+            asyncio.create_task(parse_one(i, *spec))
+            for i, spec in enumerate(file_specs)
+        ]
+
+        for _ in file_specs:
+            index, pdf_info, documents, error = await queue.get()
+            file_path, filename, document_id = file_specs[index]
+            try:
+                if error is not None:
+                    raise error
+
+                embeddings = await asyncio.to_thread(
+                    self._encode_documents_deduped, documents
+                )
+                success = await asyncio.to_thread(
+                    self.vector_store.add_documents, documents, embeddings
+                )
+                if not success:
+                    raise Exception("Failed to store document in vector database")
+
+                await asyncio.to_thread(self.metadata_store.upsert, {
+                    "document_id": document_id,
+                    "filename": filename,
+                    "file_path": file_path,
+                    "upload_date": datetime.now(),
+                    "chunk_count": len(documents),
+                    "file_size": pdf_info.get("file_size", 0),
+                    "page_count": pdf_info.get("page_count", 0),
+                    "status": "completed"
+                })
+                results[index] = {
+                    "document_id": document_id,
+                    "filename": filename,
+                    "chunk_count": len(documents),
+                    "status": "completed",
+                    "message": "PDF processed and stored successfully"
+                }
+            except Exception as e:
+                logger.error(f"Error processing PDF {filename}: {str(e)}")
+                await asyncio.to_thread(self.metadata_store.upsert, {
+                    "document_id": document_id,
+                    "filename": filename,
+                    "file_path": file_path,
+                    "upload_date": datetime.now(),
+                    "status": "failed",
+                    "error_message": str(e)
+                })
+                results[index] = {
+                    "document_id": document_id,
+                    "filename": filename,
+                    "status": "failed",
+                    "message": str(e)
+                }
+
+        await asyncio.gather(*parsers)
+        logger.info(f"Batch ingestion finished for {len(file_specs)} files")
+        return results
+
     async def answer_question(
         self, 
         question: str, 
@@ -173,16 +423,91 @@ class RAGService:
             if not question.strip():
                 raise ValueError("Empty question provided")
 
-            # Generate embedding for the question
-            question_embedding = self.embedding_service.encode_query(question)
+            # Generate embedding for the question; repeats hit the cache and
+            # concurrent misses share one forward pass via the batching encoder
+            question_embedding = await self._get_question_embedding(question)
 
-            # Search for relevant chunks
-            search_results = self.vector_store.similarity_search(
+            # Search for relevant chunks; a wide ANN candidate set is
+            # reranked with exact cosine (one BLAS matvec), and full texts
+            # stay in the store until the answer hydrates its top chunks
+            search_results = await asyncio.to_thread(
+                self.vector_store.similarity_search_reranked,
                 query_embedding=question_embedding,
                 k=max_chunks,
                 document_id=document_id
             )
 
+            # _build_answer hydrates chunk texts from the store, so it is
+            # blocking too and runs in a worker thread
+            return await asyncio.to_thread(
+                self._build_answer, question, search_results, document_id
+            )
+
+        except Exception as e:
+            logger.error(f"Error answering question: {str(e)}")
+            raise
+
+    async def answer_questions(
+        self,
+        questions: List[str],
+        document_id: Optional[str] = None,
+        max_chunks: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        Answer several questions in one retrieval pass.
+
+        All questions are encoded in a single model forward pass and resolved
+        with one batched vector store query instead of one round-trip each.
+
+        Args:
+            questions: User's questions
+            document_id: Optional specific document to search in
+            max_chunks: Maximum number of relevant chunks per question
+
+        Returns:
+            One answer dict per question, in input order
+        """
+        try:
+            logger.info(f"Answering {len(questions)} questions")
+
+            if not questions or any(not q.strip() for q in questions):
+                raise ValueError("Empty question provided")
+
+            # Encode all questions in one forward pass, off the event loop
+            question_embeddings = await asyncio.to_thread(
+                self.embedding_service.encode_queries, questions
+            )
+
+            # One batched similarity search for all questions
+            batch_results = await asyncio.to_thread(
+                self.vector_store.similarity_search_batch,
+                query_embeddings=question_embeddings,
+                k=max_chunks,
+                document_id=document_id,
+                include_documents=False
+            )
+
+            # One worker-thread hop for all answers; _build_answer hydrates
+            # chunk texts from the store and must stay off the event loop
+            return await asyncio.to_thread(
+                lambda: [
+                    self._build_answer(question, search_results, document_id)
+                    for question, search_results in zip(questions, batch_results)
+                ]
+            )
+
+        except Exception as e:
+            logger.error(f"Error answering questions: {str(e)}")
+            raise
+
+    def _build_answer(
+        self,
+        question: str,
+        search_results: List[Dict[str, Any]],
+        document_id: Optional[str]
+    ) -> Dict[str, Any]:
+        """Turn raw search results into an answer payload with sources."""
+        try:
             if not search_results:
                 return {
                     "answer": "I couldn't find any relevant information to answer your question.",
@@ -191,16 +516,21 @@ class RAGService:
                     "document_id": document_id
                 }
 
-            # Filter results by similarity threshold (ChromaDB returns distances, lower is better)
-            relevant_chunks = []
-            for result in search_results:
-                # ChromaDB returns cosine distance, convert to similarity
-                distance = result.get('distance', 2.0)
-                similarity = max(0.0, 1.0 - (distance / 2.0))  # Normalize distance to similarity
-                
+            # Convert distances to cosine similarities in one vectorized
+            # pass; the vector store knows its collection's recorded space
+            # (l2 stores predate the ip default) and applies the right
+            # mapping
+            distances = np.fromiter(
+                (r.get('distance') if r.get('distance') is not None else 2.0
+                 for r in search_results),
+                dtype=np.float32,
+                count=len(search_results)
+            )
+            similarities = self.vector_store.distances_to_similarities(distances)
+            for result, similarity in zip(search_results, similarities):
                 # For debugging: accept all results for now, we'll filter later
-                result['similarity'] = similarity
-                relevant_chunks.append(result)
+                result['similarity'] = float(similarity)
+            relevant_chunks = search_results
 
             if not relevant_chunks:
                 return {
@@ -210,15 +540,36 @@ class RAGService:
                     "document_id": document_id
                 }
 
+            # Hydrate full text for the chunks answer generation will
+            # actually read, plus any legacy chunks ingested before preview
+            # metadata existed; everything else gets by on the stored preview
+            top_chunks = heapq.nlargest(
+                3, relevant_chunks, key=lambda c: c.get("similarity", 0.0)
+            )
+            missing = {
+                c["id"]: c for c in top_chunks if c.get("content") is None
+            }
+            for chunk in relevant_chunks:
+                if chunk.get("content") is None and "preview" not in chunk["metadata"]:
+                    missing.setdefault(chunk["id"], chunk)
+            if missing:
+                contents = self.vector_store.get_contents(list(missing))
+                for chunk_id, chunk in missing.items():
+                    chunk["content"] = (
+                        contents.get(chunk_id)
+                        or chunk["metadata"].get("preview", "")
+                    )
+
             # Generate answer using retrieved context
             answer_result = self._generate_answer(question, relevant_chunks)
-            
-            # Prepare sources information
+
+            # Prepare sources information from the ingest-time previews
             sources = []
             for chunk in relevant_chunks:
+                text = chunk.get("content") or chunk["metadata"].get("preview", "")
                 source = {
                     "chunk_id": chunk["metadata"].get("chunk_id", "unknown"),
-                    "content": chunk["content"][:200] + "..." if len(chunk["content"]) > 200 else chunk["content"],
+                    "content": text[:200] + "..." if len(text) > 200 else text,
                     "similarity": chunk.get("similarity", 0.0),
                     "filename": chunk["metadata"].get("filename", "unknown"),
                     "document_id": chunk["metadata"].get("document_id")
@@ -247,19 +598,20 @@ class RAGService:
         an LLM like OpenAI GPT, Anthropic Claude, or a local model.
         """
         try:
-            # Combine relevant chunks
-            context_parts = []
-            for chunk in relevant_chunks:
-                context_parts.append(chunk["content"])
-
-            context = "\n\n".join(context_parts)
-            
-            # Simple keyword-based answer generation (replace with LLM in production)
-            answer = self._simple_answer_generation(question, context, relevant_chunks)
+            # Simple keyword-based answer generation (replace with LLM in
+            # production). No joined context string is built here: the
+            # generator reads the chunks it needs directly, so the full
+            # concatenated text is never materialized. When an LLM is wired
+            # in, feed it the chunk texts as an iterable for the same reason.
+            answer = self._simple_answer_generation(question, relevant_chunks)
             
-            # Calculate confidence based on similarity scores
-            similarities = [chunk.get("similarity", 0.0) for chunk in relevant_chunks]
-            avg_similarity = sum(similarities) / len(similarities) if similarities else 0.0
+            # Calculate confidence based on similarity scores (one numpy pass)
+            similarities = np.fromiter(
+                (chunk.get("similarity", 0.0) for chunk in relevant_chunks),
+                dtype=np.float32,
+                count=len(relevant_chunks)
+            )
+            avg_similarity = float(similarities.mean()) if len(similarities) else 0.0
             confidence = min(avg_similarity * 1.2, 1.0)  # Scale up slightly but cap at 1.0
 
             return {
@@ -274,7 +626,7 @@ class RAGService:
                 "confidence": 0.0
             }
 
-    def _simple_answer_generation(self, question: str, context: str, chunks: List[Dict[str, Any]]) -> str:
+    def _simple_answer_generation(self, question: str, chunks: List[Dict[str, Any]]) -> str:
         """
         Enhanced answer generation without LLM.
         
@@ -283,29 +635,33 @@ class RAGService:
         if not chunks:
             return "I couldn't find any relevant information to answer your question."
         
-        # Get the best chunks for context
-        top_chunks = sorted(chunks, key=lambda x: x.get("similarity", 0.0), reverse=True)[:3]
+        # Get the best chunks for context; nlargest is O(n log 3) vs a full
+        # O(n log n) sort when only the top three are kept
+        top_chunks = heapq.nlargest(3, chunks, key=lambda x: x.get("similarity", 0.0))
         
         # Combine content from top chunks
         combined_content = " ".join([chunk["content"] for chunk in top_chunks])
         
-        # Extract key information based on question type
+        # Extract key information based on question type: tokenize the
+        # question once, then each category check is a handful of
+        # startswith calls over the few question tokens
         question_lower = question.lower()
-        
+        question_words = set(re.findall(r"[a-z]+", question_lower))
+
         # Try to extract specific information
-        if any(word in question_lower for word in ["name", "who"]):
+        if self._has_stem(question_words, self._NAME_STEMS):
             # Look for names/titles in the content
             answer = self._extract_names_info(combined_content, question)
-        elif any(word in question_lower for word in ["experience", "work", "job", "position"]):
+        elif self._has_stem(question_words, self._EXP_STEMS):
             # Look for work experience
             answer = self._extract_experience_info(combined_content, question)
-        elif any(word in question_lower for word in ["skill", "technology", "technical"]):
+        elif self._has_stem(question_words, self._SKILL_STEMS):
             # Look for skills/technologies
             answer = self._extract_skills_info(combined_content, question)
-        elif any(word in question_lower for word in ["education", "degree", "university", "college"]):
+        elif self._has_stem(question_words, self._EDU_STEMS):
             # Look for education information
             answer = self._extract_education_info(combined_content, question)
-        elif any(word in question_lower for word in ["contact", "email", "phone", "address"]):
+        elif self._has_stem(question_words, self._CONTACT_STEMS):
             # Look for contact information
             answer = self._extract_contact_info(combined_content, question)
         else:
@@ -327,16 +683,13 @@ class RAGService:
     
     def _extract_names_info(self, content: str, question: str) -> str:
         """Extract name/personal information."""
-        # Look for the main name in the header - often appears as spaced letters
-        import re
-        
         # First, check for spaced name pattern (like "M O H I T S O N I")
         # Look for the pattern at the beginning of lines
         lines = content.split('\n')
         for line in lines[:5]:  # Check first 5 lines
-            if re.match(r'^[A-Z]\s+[A-Z]\s+[A-Z]', line.strip()):
+            if _SPACED_NAME_START_RE.match(line.strip()):
                 # Extract just the name part (stop at non-letter characters after spaces)
-                spaced_name = re.match(r'^([A-Z]\s+)+[A-Z]', line.strip())
+                spaced_name = _SPACED_NAME_RE.match(line.strip())
                 if spaced_name:
                     clean_name = spaced_name.group().replace(' ', '')
                     # For MOHITSONI, split into MOHIT SONI
@@ -352,9 +705,8 @@ class RAGService:
                         return f"The person's name is {clean_name}."
         
         # Look for email addresses to extract name
-        email_pattern = r'\b([a-zA-Z0-9._%+-]+)@[a-zA-Z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        email_matches = re.findall(email_pattern, content)
-        
+        email_matches = _EMAIL_PREFIX_RE.findall(content)
+
         if email_matches:
             email_prefix = email_matches[0]
             # Try to extract name from email prefix
@@ -363,19 +715,12 @@ class RAGService:
         
         # Look for standard name patterns near the beginning
         content_first_part = content[:300]  # Focus on first part where name usually appears
-        name_patterns = [
-            r'\b[A-Z][a-z]{2,}\s+[A-Z][a-z]{2,}\b',  # First Last (minimum 3 chars each)
-        ]
-        
-        names = []
-        for pattern in name_patterns:
-            matches = re.findall(pattern, content_first_part)
-            # Filter out common words that aren't names
-            filtered_matches = [match for match in matches if not any(word in match.upper() for word in 
-                              ['FRONTEND', 'DEVELOPER', 'PROFILE', 'CONTACT', 'EDUCATION', 'EXPERIENCE', 
-                               'SKILLS', 'PROJECT', 'COLLEGE', 'SCHOOL', 'COMPANY', 'GMAIL', 'YAHOO'])]
-            names.extend(filtered_matches)
-        
+        matches = _NAME_RE.findall(content_first_part)
+        # Filter out common words that aren't names
+        names = [match for match in matches if not any(word in match.upper() for word in
+                 ['FRONTEND', 'DEVELOPER', 'PROFILE', 'CONTACT', 'EDUCATION', 'EXPERIENCE',
+                  'SKILLS', 'PROJECT', 'COLLEGE', 'SCHOOL', 'COMPANY', 'GMAIL', 'YAHOO'])]
+
         if names:
             unique_names = list(set(names))
             return f"The person's name appears to be {unique_names[0]}."
@@ -384,23 +729,12 @@ class RAGService:
     
     def _extract_experience_info(self, content: str, question: str) -> str:
         """Extract work experience information."""
-        # Look for years, companies, positions
-        import re
-        
         # Look for year patterns
-        year_pattern = r'\b(19|20)\d{2}\b'
-        years = re.findall(year_pattern, content)
-        
-        # Look for common job-related keywords
-        job_keywords = ['developer', 'engineer', 'manager', 'analyst', 'consultant', 
-                       'specialist', 'coordinator', 'director', 'lead', 'senior']
-        
-        found_roles = []
-        content_lower = content.lower()
-        for keyword in job_keywords:
-            if keyword in content_lower:
-                found_roles.append(keyword)
-        
+        years = _YEAR_RE.findall(content)
+
+        # One linear pass over the content finds every job keyword at once
+        found_roles = _find_keywords(_JOB_RE, _JOB_NESTED, content.lower())
+
         if found_roles or years:
             info_parts = []
             if years:
@@ -414,31 +748,21 @@ class RAGService:
     
     def _extract_skills_info(self, content: str, question: str) -> str:
         """Extract skills and technology information."""
-        # Common technology keywords
-        tech_keywords = ['python', 'java', 'javascript', 'react', 'node', 'sql', 'aws', 
-                        'docker', 'kubernetes', 'git', 'linux', 'mongodb', 'postgresql',
-                        'html', 'css', 'angular', 'vue', 'django', 'flask', 'spring']
-        
-        content_lower = content.lower()
-        found_skills = []
-        
-        for skill in tech_keywords:
-            if skill in content_lower:
-                found_skills.append(skill.title())
-        
+        # One linear pass over the content finds every tech keyword at once
+        found_skills = [
+            skill.title()
+            for skill in _find_keywords(_TECH_RE, _TECH_NESTED, content.lower())
+        ]
+
         if found_skills:
             return f"Technical skills mentioned: {', '.join(found_skills)}. Additional details: {content[:200]}..."
-        
+
         return f"Skills and technologies: {content[:300]}..."
     
     def _extract_education_info(self, content: str, question: str) -> str:
         """Extract education information."""
-        edu_keywords = ['university', 'college', 'degree', 'bachelor', 'master', 'phd', 
-                       'graduation', 'graduated', 'school', 'education']
-        
-        content_lower = content.lower()
-        has_education = any(keyword in content_lower for keyword in edu_keywords)
-        
+        has_education = _EDU_RE.search(content.lower()) is not None
+
         if has_education:
             return f"Educational background: {content[:300]}..."
         
@@ -446,16 +770,9 @@ class RAGService:
     
     def _extract_contact_info(self, content: str, question: str) -> str:
         """Extract contact information."""
-        import re
-        
-        # Look for email pattern
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, content)
-        
-        # Look for phone pattern
-        phone_pattern = r'\b(?:\+?1[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})\b'
-        phones = re.findall(phone_pattern, content)
-        
+        emails = _EMAIL_RE.findall(content)
+        phones = _PHONE_RE.findall(content)
+
         contact_info = []
         if emails:
             contact_info.append(f"Email: {emails[0]}")
@@ -470,17 +787,19 @@ class RAGService:
 
     def get_document_metadata(self, document_id: str) -> Optional[Dict[str, Any]]:
         """Get metadata for a specific document."""
-        return self.documents_metadata.get(document_id)
+        return self.metadata_store.get(document_id)
 
     def list_documents(self) -> List[Dict[str, Any]]:
         """List all processed documents."""
-        # Combine metadata with vector store info
+        # Combine metadata with vector store info; fetch all metadata rows
+        # once instead of one lookup per document
         vector_docs = self.vector_store.list_documents()
-        
+        meta_by_id = {m["document_id"]: m for m in self.metadata_store.list()}
+
         result = []
         for doc in vector_docs:
             doc_id = doc["document_id"]
-            metadata = self.documents_metadata.get(doc_id, {})
+            metadata = meta_by_id.get(doc_id, {})
             
             combined_info = {
                 "document_id": doc_id,
@@ -499,11 +818,11 @@ class RAGService:
         try:
             # Delete from vector store
             success = self.vector_store.delete_document(document_id)
-            
+
             # Remove from metadata
-            if document_id in self.documents_metadata:
+            metadata = self.metadata_store.get(document_id)
+            if metadata is not None:
                 # Optionally delete the file from disk
-                metadata = self.documents_metadata[document_id]
                 file_path = metadata.get("file_path")
                 if file_path and os.path.exists(file_path):
                     try:
@@ -511,9 +830,8 @@ class RAGService:
                         logger.info(f"Deleted file: {file_path}")
                     except Exception as e:
                         logger.warning(f"Could not delete file {file_path}: {str(e)}")
-                
-                del self.documents_metadata[document_id]
-                self._save_metadata()
+
+                self.metadata_store.delete(document_id)
 
             logger.info(f"Successfully deleted document: {document_id}")
             return success
@@ -529,11 +847,12 @@ class RAGService:
             embedding_info = self.embedding_service.get_model_info()
             
             stats = {
-                "total_documents": len(self.documents_metadata),
+                "total_documents": self.metadata_store.count(),
                 "total_chunks": vector_stats.get("total_chunks", 0),
                 "embedding_model": embedding_info.get("model_name"),
                 "embedding_dimension": embedding_info.get("embedding_dimension"),
-                "vector_store_path": self.vector_store.persist_directory
+                "vector_store_path": self.vector_store.persist_directory,
+                "hnsw": vector_stats.get("hnsw")
             }
 
             return stats